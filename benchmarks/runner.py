@@ -0,0 +1,232 @@
+"""
+Runs benchmark workloads through each way of dumping output, and
+compares the results of separate runs.
+"""
+import collections
+import datetime
+import platform
+import statistics
+import sys
+import time
+import typing
+
+import codenode
+from codenode.debug import debug_writer_type
+from codenode.source_map import SourceMap, source_map_patch
+
+from .workloads import workloads
+
+if typing.TYPE_CHECKING:
+    from typing import Callable, Iterable, Optional, Type
+
+
+class NullStream:
+    """
+    A stream that discards everything written to it.
+    """
+    def write(self, text):
+        pass
+
+
+def dump(writer_type: 'Type[codenode.Writer]', node):
+    writer_type(node).dump(NullStream())
+
+
+def dumps(writer_type: 'Type[codenode.Writer]', node):
+    writer_type(node).dumps()
+
+
+def dump_iter(writer_type: 'Type[codenode.Writer]', node):
+    collections.deque(writer_type(node).dump_iter(), maxlen=0)
+
+
+def dumps_source_map(writer_type: 'Type[codenode.Writer]', node):
+    source_map_patch(writer_type, SourceMap())(node).dumps()
+
+
+modes = {
+    'dump': dump,
+    'dumps': dumps,
+    'dump_iter': dump_iter,
+    'dumps_source_map': dumps_source_map,
+}
+"Functions that dump a node using a writer type, keyed by name."
+
+debug_modes = {
+    '': False,
+    '/debug': True,
+    '/lazy_debug': 'lazy',
+}
+"""
+Values of the debug parameter of codenode.dump/dumps to benchmark,
+keyed by the suffix added to benchmark names.
+"""
+
+
+def measure(
+        workload: 'Callable[[int], object]',
+        mode: 'Callable[[Type[codenode.Writer], object], None]',
+        writer_type: 'Type[codenode.Writer]',
+        *,
+        scale=1,
+        repeat=5,
+) -> dict:
+    """
+    Time a workload dumped a number of times. Node trees are built
+    before timing starts.
+
+    :param workload: Function that builds a node tree.
+    :param mode: Function that dumps the node tree.
+    :param writer_type: Writer type used to dump the node tree.
+    :param scale: Scale factor passed to the workload.
+    :param repeat: Number of times to dump the workload.
+    :return: Dict of timings in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        node = workload(scale)
+        start = time.perf_counter()
+        mode(writer_type, node)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'min': min(timings),
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'repeat': repeat,
+    }
+
+
+def run(
+        *,
+        writer_type: 'Optional[Type[codenode.Writer]]' = None,
+        names: 'Optional[Iterable[str]]' = None,
+        scale=1,
+        repeat=5,
+        log=sys.stderr,
+) -> dict:
+    """
+    Run benchmarks for each combination of workload, dump mode and
+    debug setting.
+
+    :param writer_type: Writer type to benchmark.
+                        Defaults to codenode.default_writer_type.
+    :param names: Names of workloads to run. Runs all of them by default.
+    :param scale: Scale factor passed to each workload.
+    :param repeat: Number of times to dump each workload.
+    :param log: Stream that progress is written to.
+    :return: JSON serializable dict containing results, keyed by
+             benchmark name, along with info about the environment.
+    """
+    if writer_type is None:
+        writer_type = codenode.default_writer_type
+
+    results = {}
+    for name in names or workloads:
+        for mode_name, mode in modes.items():
+            for suffix, debug in debug_modes.items():
+                key = f'{name}/{mode_name}{suffix}'
+                results[key] = measure(
+                    workloads[name],
+                    mode,
+                    debug_writer_type(writer_type, debug),
+                    scale=scale,
+                    repeat=repeat,
+                )
+                log.write(f'{key}: {results[key]["min"]:.6f}s\n')
+
+    return {
+        'info': {
+            'python': sys.version,
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'writer_type': writer_type.__qualname__,
+            'scale': scale,
+            'date': datetime.datetime.now().isoformat(),
+        },
+        'results': results,
+    }
+
+
+def relative_change(old_result: dict, new_result: dict) -> 'Optional[float]':
+    """
+    :param old_result: Timings of a benchmark in the baseline run.
+    :param new_result: Timings of the same benchmark in another run.
+    :return: Relative change in minimum time, i.e. 0.1 for 10% slower,
+             or None if either minimum time is missing or the baseline's
+             is zero.
+    """
+    old_time = old_result.get('min')
+    new_time = new_result.get('min')
+    if not old_time or new_time is None:
+        return None
+    return new_time / old_time - 1
+
+
+def compare(old: dict, new: dict, *, threshold=0.1) -> 'dict[str, float]':
+    """
+    Compare the results of two benchmark runs.
+
+    :param old: Results of the baseline run.
+    :param new: Results of the run to compare against the baseline.
+    :param threshold: Relative slowdown above which a benchmark is
+                      considered a regression, i.e. 0.1 for 10%.
+    :return: Relative change in minimum time of each benchmark present
+             in both runs which regressed, keyed by benchmark name.
+             Benchmarks without timings to compare are skipped.
+    """
+    regressions = {}
+    for key, new_result in new['results'].items():
+        try:
+            old_result = old['results'][key]
+        except KeyError:
+            continue
+
+        change = relative_change(old_result, new_result)
+        if change is not None and change > threshold:
+            regressions[key] = change
+
+    return regressions
+
+
+def format_time(result: dict) -> str:
+    """
+    :param result: Timings of a benchmark.
+    :return: Minimum time formatted for display.
+    """
+    try:
+        return f'{result["min"]:.6f}s'
+    except KeyError:
+        return 'n/a'
+
+
+def format_comparison(old: dict, new: dict, *, threshold=0.1) -> str:
+    """
+    :param old: Results of the baseline run.
+    :param new: Results of the run to compare against the baseline.
+    :param threshold: Relative slowdown above which a benchmark is
+                      considered a regression, i.e. 0.1 for 10%.
+    :return: Table showing the change in minimum time of each benchmark
+             present in both runs, with regressions flagged.
+    """
+    regressions = compare(old, new, threshold=threshold)
+    rows = []
+    for key, new_result in new['results'].items():
+        if key in old['results']:
+            old_result = old['results'][key]
+            change = relative_change(old_result, new_result)
+            rows.append((
+                key,
+                format_time(old_result),
+                format_time(new_result),
+                'n/a' if change is None else f'{change:+.1%}',
+                'REGRESSION' if key in regressions else '',
+            ))
+
+    widths = [max(map(len, column), default=0) for column in zip(*rows)]
+    return ''.join(
+        '  '.join(
+            cell.ljust(width) for cell, width in zip(row, widths)
+        ).rstrip() + '\n'
+        for row in rows
+    )
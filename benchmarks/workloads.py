@@ -0,0 +1,119 @@
+"""
+Synthetic node trees used to benchmark codenode.
+
+Each workload is a function that takes a scale factor and returns a
+freshly built node tree, since trees containing generators can only be
+dumped once.
+"""
+import codenode
+from codenode import line, lines, indent, dedent, indentation, newline
+from codenode_utilities import PartitionedNode, joined, prefixer, suffixer
+
+
+def deep_nesting(scale: int):
+    """
+    Lines nested hundreds of indentation levels deep.
+    """
+    def level(depth):
+        yield line(f'if depth_{depth}:')
+        if depth:
+            yield indent
+            yield lines('a = 1', 'b = 2')
+            yield level(depth - 1)
+            yield dedent
+
+    return [level(100) for _ in range(10 * scale)]
+
+
+def wide_flat(scale: int):
+    """
+    A single list holding a huge number of lines.
+    """
+    return [line(f'value_{i} = {i}') for i in range(20_000 * scale)]
+
+
+def generators(scale: int):
+    """
+    Nested generators yielding individual string chunks.
+    """
+    def statement(i):
+        yield indentation
+        yield 'print('
+        yield str(i)
+        yield ')'
+        yield newline
+
+    def function(i):
+        yield indentation, 'def function_', str(i), '():', newline
+        yield indent
+        for j in range(20):
+            yield statement(j)
+        yield dedent
+
+    return (function(i) for i in range(500 * scale))
+
+
+class Class(PartitionedNode):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    def header(self):
+        yield line(f'class {self.name}:')
+
+
+class Function(PartitionedNode):
+    def __init__(self, name, *args):
+        super().__init__()
+        self.name = name
+        self.args = args
+
+    def header(self):
+        yield line(f'def {self.name}({", ".join(self.args)}):')
+
+    def footer(self):
+        yield newline
+
+
+def partitioned_nodes(scale: int):
+    """
+    A hierarchy of PartitionedNode classes and methods.
+    """
+    module = []
+    for i in range(100 * scale):
+        cls = Class(f'Class{i}')
+        for j in range(10):
+            method = cls.add_child(Function(f'method_{j}', 'self', 'x'))
+            method.add_children(lines('y = x + 1', 'return y'))
+        module.append(cls)
+    return module
+
+
+def utilities(scale: int):
+    """
+    Output passed through the prefixer, suffixer and joined utilities.
+    """
+    comment = prefixer('# ')
+    continuation = suffixer(' \\')
+
+    def block(i):
+        yield comment(lines(f'block {i}', 'generated'))
+        yield continuation(lines(
+            f'#define MACRO_{i}(x)', 'do {', '} while (0)',
+        ))
+        yield line(joined(
+            (f'argument_{j}' for j in range(20)),
+            start=f'call_{i}(', separator=', ', end=')',
+        ))
+
+    return [block(i) for i in range(500 * scale)]
+
+
+workloads = {
+    'deep_nesting': deep_nesting,
+    'wide_flat': wide_flat,
+    'generators': generators,
+    'partitioned_nodes': partitioned_nodes,
+    'utilities': utilities,
+}
+"Workload functions keyed by name."
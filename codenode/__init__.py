@@ -1,22 +1,33 @@
 from .writer import Writer
+from .fast_writer import FastWriter
+from .async_writer import AsyncWriter
 from .nodes.depth_change import RelativeDepthChange
 from .nodes.indentation import CurrentIndentation
 from .nodes.newline import Newline
-from .debug import debug_patch
+from .nodes.frozen import FrozenNode
+from .nodes.writer_context import WriterCallback
+from .nodes.buffer import NodeBuffer
+from .debug import debug_patch, lazy_debug_patch, debug_writer_type
+from .parallel import dump_many, DumpManyError
+from .profiler import RenderProfile, profile_patch
+from .source_map import SourceMap, source_map_patch
+from .subtree_cache import SubtreeCache
+from .file_sink import ChangedFileSink
+from .line_index import LineIndex, slice_lines
 
 default_writer_type = Writer
 "Default Writer type used in codenode.dump and codenode.dumps."
 
-indent = RelativeDepthChange(1)
+indent = RelativeDepthChange.of(1)
 "A node representing a single increase in indentation level."
 
-dedent = RelativeDepthChange(-1)
+dedent = RelativeDepthChange.of(-1)
 "A node representing a single decrease in indentation level."
 
-indentation = CurrentIndentation()
+indentation = CurrentIndentation.of()
 "A placeholder node for indentation whitespace at the start of a line."
 
-newline = Newline()
+newline = Newline.of()
 "A placeholder node for line terminators."
 
 
@@ -64,12 +75,50 @@ def indented(*nodes) -> tuple:
     return indent, nodes, dedent
 
 
+def freeze(node) -> FrozenNode:
+    """
+    Walks a node tree once and returns a frozen copy of it which is
+    much faster to process. Useful for static sections of output that
+    are dumped many times, possibly at different depths or with different
+    indentation and newline strings.
+
+    The frozen node can be nested inside other node trees like any other
+    node.
+
+    :param node: Node tree to freeze. Must contain only strings,
+                 iterables, frozen nodes and the built-in node types.
+    :return: Frozen copy of the node tree.
+    """
+    return FrozenNode(node)
+
+
+def with_writer(function: 'Callable[[Writer], T]') -> WriterCallback:
+    """
+    Returns a node which calls a function with the writer processing it,
+    then processes the function's result in its place.
+
+    Useful for nodes that render part of a node tree separately, i.e. to
+    transform its output, since writer.sub_writer creates a writer
+    matching the type and settings of the one processing the outer
+    node tree.
+
+    :param function: Function that takes a writer and returns a node.
+    :return: Node which calls the function when processed.
+    """
+    return WriterCallback(function)
+
+
 def dump(
         node, stream, *,
         indentation='    ',
         newline='\n',
         depth=0,
         debug=False,
+        buffer_size=0,
+        flush=False,
+        profile: 'RenderProfile' = None,
+        cache: 'SubtreeCache' = None,
+        source_map: 'SourceMap' = None,
 ):
     """
     Process and write out a node tree to a stream.
@@ -81,18 +130,34 @@ def dump(
     :param depth: Base depth (i.e. number of indents) to start at.
     :param debug: If True, will print out extra info when an error
                   occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param buffer_size: If above 0, output is joined together into chunks
+                        of at least this many characters before being
+                        written to the stream.
+    :param flush: If True, the stream's flush method is called after
+                  each write.
+    :param profile: If given, timings and output counts are recorded into
+                    this profile while processing.
+    :param cache: If given, output of cacheable nodes is stored in and
+                  reused from this cache.
+    :param source_map: If given, the node that produced each part of the
+                       output is recorded into this source map.
     """
-    if debug:
-        writer_type = debug_patch(default_writer_type)
-    else:
-        writer_type = default_writer_type
+    writer_type = debug_writer_type(default_writer_type, debug)
+    if profile is not None:
+        writer_type = profile_patch(writer_type, profile)
+    if source_map is not None:
+        writer_type = source_map_patch(writer_type, source_map)
 
-    return writer_type(
+    writer = writer_type(
         node,
         indentation=indentation,
         newline=newline,
         depth=depth,
-    ).dump(stream)
+    )
+    writer.subtree_cache = cache
+    return writer.dump(stream, buffer_size=buffer_size, flush=flush)
 
 
 def dumps(
@@ -101,6 +166,9 @@ def dumps(
         newline='\n',
         depth=0,
         debug=False,
+        profile: 'RenderProfile' = None,
+        cache: 'SubtreeCache' = None,
+        source_map: 'SourceMap' = None,
 ) -> str:
     """
     Process and write out a node tree as a string.
@@ -111,25 +179,459 @@ def dumps(
     :param depth: Base depth (i.e. number of indents) to start at.
     :param debug: If True, will print out extra info when an error
                   occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param profile: If given, timings and output counts are recorded into
+                    this profile while processing.
+    :param cache: If given, output of cacheable nodes is stored in and
+                  reused from this cache.
+    :param source_map: If given, the node that produced each part of the
+                       output is recorded into this source map.
 
     :return: String representation of node tree.
     """
-    if debug:
-        writer_type = debug_patch(default_writer_type)
-    else:
-        writer_type = default_writer_type
+    writer_type = debug_writer_type(default_writer_type, debug)
+    if profile is not None:
+        writer_type = profile_patch(writer_type, profile)
+    if source_map is not None:
+        writer_type = source_map_patch(writer_type, source_map)
+
+    writer = writer_type(
+        node,
+        indentation=indentation,
+        newline=newline,
+        depth=depth,
+    )
+    writer.subtree_cache = cache
+    return writer.dumps()
+
+
+def dumps_range(
+        node, start_line: int, end_line: int, *,
+        indentation='    ',
+        newline='\n',
+        depth=0,
+        debug=False,
+        cache: 'SubtreeCache' = None,
+) -> str:
+    """
+    Process and write out a range of lines of a node tree's output as a
+    string. Processing stops once the last line is reached, and output
+    before the first line is discarded as it is produced.
+
+    If the node is a frozen node, a LineIndex of it is created on first
+    use and kept for as long as the frozen node exists, so that only the
+    lines in the range are rendered each time.
+
+    :param node: Base node of node tree.
+    :param start_line: Index of the first line to include.
+    :param end_line: Index of the line to stop before.
+    :param indentation: String used for indents in the output.
+    :param newline: String used for newlines in the output.
+    :param depth: Base depth (i.e. number of indents) to start at.
+    :param debug: If True, will print out extra info when an error
+                  occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param cache: If given, output of cacheable nodes is stored in and
+                  reused from this cache.
+
+    :return: Lines from start_line up to end_line, including their
+             newlines.
+    """
+    if isinstance(node, FrozenNode):
+        return LineIndex.of(
+            node,
+            indentation=indentation,
+            newline=newline,
+            depth=depth,
+        ).dumps_range(start_line, end_line)
+
+    writer_type = debug_writer_type(default_writer_type, debug)
+
+    writer = writer_type(
+        node,
+        indentation=indentation,
+        newline=newline,
+        depth=depth,
+    )
+    writer.subtree_cache = cache
+    return ''.join(
+        slice_lines(writer.dump_iter(), max(start_line, 0), end_line)
+    )
+
+
+def dump_bytes(
+        node, stream, *,
+        encoding='utf-8',
+        errors='strict',
+        indentation='    ',
+        newline='\n',
+        depth=0,
+        debug=False,
+        buffer_size=65536,
+):
+    """
+    Process and write out a node tree to a binary stream, encoding
+    output incrementally as it is produced.
+
+    :param node: Base node of node tree.
+    :param stream: An object with a 'write' method that accepts bytes.
+    :param encoding: Encoding used for the output.
+    :param errors: Error handling scheme used when encoding,
+                   i.e. 'strict', 'replace' or 'ignore'.
+    :param indentation: String used for indents in the output.
+    :param newline: String used for newlines in the output.
+    :param depth: Base depth (i.e. number of indents) to start at.
+    :param debug: If True, will print out extra info when an error
+                  occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param buffer_size: Output is joined together into chunks of at least
+                        this many characters before being encoded and
+                        written to the stream.
+    """
+    writer_type = debug_writer_type(default_writer_type, debug)
 
     return writer_type(
         node,
         indentation=indentation,
         newline=newline,
         depth=depth,
-    ).dumps()
+    ).dump_bytes(
+        stream,
+        encoding=encoding,
+        errors=errors,
+        buffer_size=buffer_size,
+    )
+
+
+def dumpb(
+        node, *,
+        encoding='utf-8',
+        errors='strict',
+        indentation='    ',
+        newline='\n',
+        depth=0,
+        debug=False,
+        buffer: 'bytearray' = None,
+        size: int = None,
+) -> bytearray:
+    """
+    Process and write out a node tree as encoded bytes, without holding
+    the output as a string.
+
+    :param node: Base node of node tree.
+    :param encoding: Encoding used for the output.
+    :param errors: Error handling scheme used when encoding,
+                   i.e. 'strict', 'replace' or 'ignore'.
+    :param indentation: String used for indents in the output.
+    :param newline: String used for newlines in the output.
+    :param depth: Base depth (i.e. number of indents) to start at.
+    :param debug: If True, will print out extra info when an error
+                  occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param buffer: Existing bytearray to reuse. Its contents are
+                   replaced with the output.
+    :param size: If given, the size of the encoded output in bytes,
+                 i.e. from measure. The buffer is allocated at this size
+                 up front and filled in place.
+
+    :return: Bytearray containing the encoded output.
+    """
+    writer_type = debug_writer_type(default_writer_type, debug)
+
+    return writer_type(
+        node,
+        indentation=indentation,
+        newline=newline,
+        depth=depth,
+    ).dumpb(
+        encoding=encoding,
+        errors=errors,
+        buffer=buffer,
+        size=size,
+    )
+
+
+def measure(
+        node, *,
+        encoding=None,
+        errors='strict',
+        indentation='    ',
+        newline='\n',
+        depth=0,
+        debug=False,
+        cache: 'SubtreeCache' = None,
+) -> int:
+    """
+    Process a node tree and count the size of its output, without
+    holding the output in memory. Useful for preallocating space for the
+    output, i.e. using dumpb's size parameter or dump_mmap.
+
+    Frozen nodes memoize their output, so measuring then dumping a node
+    tree with the same settings only renders them once.
+
+    :param node: Base node of node tree.
+    :param encoding: If given, the number of bytes in the output encoded
+                     using this encoding is counted instead of the number
+                     of characters.
+    :param errors: Error handling scheme used when encoding,
+                   i.e. 'strict', 'replace' or 'ignore'.
+    :param indentation: String used for indents in the output.
+    :param newline: String used for newlines in the output.
+    :param depth: Base depth (i.e. number of indents) to start at.
+    :param debug: If True, will print out extra info when an error
+                  occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param cache: If given, output of cacheable nodes is stored in and
+                  reused from this cache.
+
+    :return: Size of the output.
+    """
+    writer_type = debug_writer_type(default_writer_type, debug)
+
+    writer = writer_type(
+        node,
+        indentation=indentation,
+        newline=newline,
+        depth=depth,
+    )
+    writer.subtree_cache = cache
+    return writer.measure(encoding=encoding, errors=errors)
+
+
+def dump_mmap(
+        node, path, *,
+        size: int = None,
+        encoding='utf-8',
+        errors='strict',
+        indentation='    ',
+        newline='\n',
+        depth=0,
+        debug=False,
+        cache: 'SubtreeCache' = None,
+) -> int:
+    """
+    Process and write out a node tree to a file, which is created at its
+    final size up front and filled through a memory map. Peak memory use
+    doesn't depend on the size of the output.
+
+    If the size isn't given, the node tree is measured first, so it must
+    be possible to iterate over it twice, i.e. it must not contain
+    generators. A ValueError is raised if the output then differs in
+    size from the measured size, and the existing file is left as it is.
+    Frozen nodes and cacheable nodes (given a cache) are only
+    rendered once.
+
+    :param node: Base node of node tree.
+    :param path: Path of file to write to.
+    :param size: Size of the encoded output in bytes, if already known.
+    :param encoding: Encoding used for the output.
+    :param errors: Error handling scheme used when encoding,
+                   i.e. 'strict', 'replace' or 'ignore'.
+    :param indentation: String used for indents in the output.
+    :param newline: String used for newlines in the output.
+    :param depth: Base depth (i.e. number of indents) to start at.
+    :param debug: If True, will print out extra info when an error
+                  occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param cache: If given, output of cacheable nodes is stored in and
+                  reused from this cache.
+
+    :return: Number of bytes written.
+    """
+    exact_size = size is None
+    if exact_size:
+        size = measure(
+            node,
+            encoding=encoding,
+            errors=errors,
+            indentation=indentation,
+            newline=newline,
+            depth=depth,
+            debug=debug,
+            cache=cache,
+        )
+
+    writer_type = debug_writer_type(default_writer_type, debug)
+
+    writer = writer_type(
+        node,
+        indentation=indentation,
+        newline=newline,
+        depth=depth,
+    )
+    writer.subtree_cache = cache
+    return writer.dump_mmap(
+        path, size,
+        encoding=encoding,
+        errors=errors,
+        exact_size=exact_size,
+    )
+
+
+def fingerprint(
+        node, *,
+        algorithm='sha256',
+        encoding='utf-8',
+        errors='strict',
+        indentation='    ',
+        newline='\n',
+        depth=0,
+        debug=False,
+        cache: 'SubtreeCache' = None,
+) -> str:
+    """
+    Hash the output of a node tree in a single pass, without building
+    the output as a string. The result is the same as hashing a file the
+    output was written to, i.e. using hashlib.file_digest, so it can be
+    used to check whether a file needs to be written again.
+
+    Passing the same cache each time skips processing cacheable nodes
+    whose output hasn't changed, and frozen nodes reuse their output too.
+
+    :param node: Base node of node tree.
+    :param algorithm: Name of a hash algorithm supported by hashlib.
+    :param encoding: Encoding used for the output.
+    :param errors: Error handling scheme used when encoding,
+                   i.e. 'strict', 'replace' or 'ignore'.
+    :param indentation: String used for indents in the output.
+    :param newline: String used for newlines in the output.
+    :param depth: Base depth (i.e. number of indents) to start at.
+    :param debug: If True, will print out extra info when an error
+                  occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param cache: If given, output of cacheable nodes is stored in and
+                  reused from this cache.
+
+    :return: Hex digest of the encoded output.
+    """
+    writer_type = debug_writer_type(default_writer_type, debug)
+
+    writer = writer_type(
+        node,
+        indentation=indentation,
+        newline=newline,
+        depth=depth,
+    )
+    writer.subtree_cache = cache
+    return writer.fingerprint(
+        algorithm=algorithm,
+        encoding=encoding,
+        errors=errors,
+    )
+
+
+def dump_if_changed(
+        node, path, *,
+        encoding='utf-8',
+        errors='strict',
+        indentation='    ',
+        newline='\n',
+        depth=0,
+        debug=False,
+        buffer_size=65536,
+        cache: 'SubtreeCache' = None,
+) -> bool:
+    """
+    Process and write out a node tree to a file, only if the output
+    differs from the file's existing contents. Output is compared against
+    the existing file as it is produced, and writing only starts once a
+    difference is found. Changed files are replaced atomically.
+
+    :param node: Base node of node tree.
+    :param path: Path of file to write to.
+    :param encoding: Encoding used for the output.
+    :param errors: Error handling scheme used when encoding,
+                   i.e. 'strict', 'replace' or 'ignore'.
+    :param indentation: String used for indents in the output.
+    :param newline: String used for newlines in the output.
+    :param depth: Base depth (i.e. number of indents) to start at.
+    :param debug: If True, will print out extra info when an error
+                  occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param buffer_size: Output is joined together into chunks of at least
+                        this many characters before being compared.
+    :param cache: If given, output of cacheable nodes is stored in and
+                  reused from this cache.
+
+    :return: True if the file was written.
+    """
+    writer_type = debug_writer_type(default_writer_type, debug)
+
+    writer = writer_type(
+        node,
+        indentation=indentation,
+        newline=newline,
+        depth=depth,
+    )
+    writer.subtree_cache = cache
+    with ChangedFileSink(path, encoding=encoding, errors=errors) as sink:
+        writer.dump(sink, buffer_size=buffer_size)
+    return sink.changed
+
+
+async def adump(
+        node, stream, *,
+        encoding=None,
+        errors='strict',
+        indentation='    ',
+        newline='\n',
+        depth=0,
+        debug=False,
+        buffer_size=65536,
+):
+    """
+    Process and write out a node tree to a stream without blocking the
+    event loop. The node tree may contain async iterables and awaitables.
+
+    :param node: Base node of node tree.
+    :param stream: An object with a 'write' method, which may be a
+                   coroutine function. If the stream has a 'drain'
+                   method, such as asyncio.StreamWriter, it is awaited
+                   after each write.
+    :param encoding: If given, output is encoded using this encoding
+                     before being written, i.e. for streams that
+                     accept bytes.
+    :param errors: Error handling scheme used when encoding,
+                   i.e. 'strict', 'replace' or 'ignore'.
+    :param indentation: String used for indents in the output.
+    :param newline: String used for newlines in the output.
+    :param depth: Base depth (i.e. number of indents) to start at.
+    :param debug: If True, will print out extra info when an error
+                  occurs to give a better idea of which node caused it.
+                  If 'lazy', the same info is worked out after an
+                  error occurs instead, with almost no overhead.
+    :param buffer_size: Output is joined together into chunks of at least
+                        this many characters before being written.
+    """
+    writer_type = debug_writer_type(AsyncWriter, debug)
+
+    return await writer_type(
+        node,
+        indentation=indentation,
+        newline=newline,
+        depth=depth,
+    ).adump(
+        stream,
+        encoding=encoding,
+        errors=errors,
+        buffer_size=buffer_size,
+    )
 
 
 __all__ = [
     'indent', 'dedent', 'indented',
     'indentation', 'newline',
-    'line', 'lines', 'empty_lines',
-    'dump', 'dumps', 'default_writer_type',
+    'line', 'lines', 'empty_lines', 'freeze', 'with_writer',
+    'dump', 'dumps', 'dumps_range', 'dump_bytes', 'dumpb', 'dump_many',
+    'adump',
+    'measure', 'dump_mmap', 'fingerprint', 'dump_if_changed',
+    'default_writer_type',
 ]
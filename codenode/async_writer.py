@@ -0,0 +1,124 @@
+import asyncio
+import codecs
+import inspect
+import typing
+
+from .writer import Writer
+
+if typing.TYPE_CHECKING:
+    from typing import AsyncIterable, Optional
+
+
+class AsyncWriter(Writer):
+    """
+    A Writer that can process node trees containing async iterables and
+    awaitables, and write out the result to asynchronous streams.
+
+    Async iterables are iterated using async for, and awaitables are
+    awaited with their result processed as a node in their place.
+    Control is handed back to the event loop periodically so that
+    rendering large node trees doesn't block other tasks.
+    """
+    yield_interval = 1024
+    "Number of chunks processed between each yield to the event loop."
+
+    async def dump_aiter(self) -> 'AsyncIterable[str]':
+        """
+        Process and write out a node tree as an async iterable of
+        string chunks.
+
+        :return: Async iterable of string chunks.
+        """
+        items = self.stack.items
+        yield_interval = self.yield_interval
+        count = 0
+
+        while items:
+            top = items[-1]
+            if hasattr(top, '__anext__'):
+                try:
+                    node = await top.__anext__()
+                except StopAsyncIteration:
+                    items.pop()
+                    continue
+            else:
+                try:
+                    node = next(top)
+                except StopIteration:
+                    items.pop()
+                    continue
+
+            if type(node) is not str:
+                while inspect.isawaitable(node):
+                    node = await node
+
+                if hasattr(node, '__aiter__'):
+                    items.append(node.__aiter__())
+                    continue
+
+            for chunk in self.process_node(node):
+                yield chunk
+                count += 1
+                if count >= yield_interval:
+                    count = 0
+                    await asyncio.sleep(0)
+
+    async def adump(
+            self, stream, *,
+            encoding: 'Optional[str]' = None,
+            errors='strict',
+            buffer_size=65536,
+    ):
+        """
+        Process and write out a node tree to a stream.
+
+        The stream's write method may either be a regular function or a
+        coroutine function. If the stream has a 'drain' method, such as
+        asyncio.StreamWriter, it is awaited after each write.
+
+        :param stream: An object with a 'write' method.
+        :param encoding: If given, output is encoded using this encoding
+                         before being written, i.e. for streams that
+                         accept bytes.
+        :param errors: Error handling scheme used when encoding,
+                       i.e. 'strict', 'replace' or 'ignore'.
+        :param buffer_size: Chunks are joined together until they contain
+                            at least this many characters before being
+                            written.
+        """
+        if encoding is None:
+            encode = None
+        else:
+            encode = codecs.getincrementalencoder(encoding)(errors).encode
+
+        drain = getattr(stream, 'drain', None)
+
+        async def write(text, final=False):
+            data = text if encode is None else encode(text, final)
+            if not data:
+                return
+            result = stream.write(data)
+            if inspect.isawaitable(result):
+                await result
+            if drain is not None:
+                await drain()
+
+        buffer = []
+        size = 0
+        async for chunk in self.dump_aiter():
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= buffer_size:
+                await write(''.join(buffer))
+                buffer.clear()
+                size = 0
+
+        await write(''.join(buffer), True)
+
+    async def adumps(self) -> str:
+        """
+        Process and write out a node tree as a string.
+
+        :return: String representation of node tree.
+        """
+        return ''.join([chunk async for chunk in self.dump_aiter()])
@@ -28,6 +28,54 @@ class DebugIterator:
         return self.item_buffer[-1] if len(self.item_buffer) else None
 
 
+def recover_iteration_state(
+        iterator,
+        count=8,
+) -> 'tuple[typing.Any, typing.Optional[tuple[int, typing.Sequence]]]':
+    """
+    Works out what an iterator is iterating over and which items it has
+    already yielded, without any tracking done beforehand.
+
+    Iterators over built-in sequences such as lists and tuples are
+    inspected using their pickling support. Generators created by an
+    __iter__ method are traced back to the object they belong to.
+
+    :param iterator: Iterator to inspect.
+    :param count: Maximum number of the most recently processed items
+                  to return.
+    :return: Tuple containing the iterable (or the iterator itself if it
+             can't be worked out) and either None or a tuple containing
+             the total number of items processed and the most recently
+             processed items.
+    """
+    try:
+        function, args, *state = iterator.__reduce__()
+    except Exception:
+        pass
+    else:
+        if (
+            function is iter and
+            len(args) == 1 and
+            isinstance(args[0], typing.Sequence) and
+            state and
+            isinstance(state[0], int)
+        ):
+            sequence, processed = args[0], state[0]
+            return sequence, (
+                processed,
+                sequence[max(processed - count, 0):processed],
+            )
+
+    frame = getattr(iterator, 'gi_frame', None)
+    if frame is not None and frame.f_code.co_name == '__iter__':
+        try:
+            return frame.f_locals['self'], None
+        except KeyError:
+            pass
+
+    return iterator, None
+
+
 def print_writer_stack(writer: Writer, stream):
     pretty_print = functools.partial(
         pprint.pprint,
@@ -40,29 +88,61 @@ def print_writer_stack(writer: Writer, stream):
 
     for index, iterator in enumerate(writer.stack.items):
         stream.write(f'node #{index}: \n')
-        stream.write(f'type: {type(iterator.iterable)}\n')
         if isinstance(iterator, DebugIterator):
-            if isinstance(iterator.iterable, typing.Sequence):
-                for sub_index, sub_item in enumerate(iterator.iterable):
+            iterable = iterator.iterable
+            processed = iterator.items_yielded, iterator.item_buffer
+        else:
+            iterable, processed = recover_iteration_state(iterator)
+
+        stream.write(f'type: {type(iterable)}\n')
+        if iterable is iterator:
+            stream.write(repr(iterator))
+            stream.write('\n')
+        else:
+            if isinstance(iterable, typing.Sequence):
+                for sub_index, sub_item in enumerate(iterable):
                     stream.write(f'  item {sub_index}: ')
                     pretty_print(sub_item)
 
             else:
-                pretty_print(iterator.iterable)
+                pretty_print(iterable)
+
+            if processed is not None:
+                total, items = processed
+                stream.write(
+                    f'  last {len(items)} items processed: '
+                    f'({total} total)\n'
+                )
+                for item in items:
+                    stream.write('    ')
+                    pretty_print(item)
+
+        if isinstance(iterator, DebugIterator):
+            iterator = iterator.iterator
+        frame = getattr(iterator, 'gi_frame', None)
+        if frame is not None:
             stream.write(
-                f'  last {len(iterator.item_buffer)} items processed: '
-                f'({iterator.items_yielded} total)\n'
+                f'  suspended at line {frame.f_lineno} of '
+                f'{frame.f_code.co_name} in {frame.f_code.co_filename}\n'
             )
-            for item in iterator.item_buffer:
-                stream.write('    ')
-                pretty_print(item)
-        else:
-            stream.write(repr(iterator))
-            stream.write('\n')
 
         stream.write('\n')
 
 
+def add_writer_stack_info(writer: Writer, error: Exception):
+    """
+    Appends a printout of a writer's stack to an error's message.
+
+    :param writer: Writer which was processing when the error occurred.
+    :param error: Error to alter.
+    """
+    buffer = io.StringIO()
+    buffer.write(''.join(map(str, error.args)))
+    buffer.write('\n\nWriter stack:\n')
+    print_writer_stack(writer, buffer)
+    error.args = (buffer.getvalue(),)
+
+
 def debug_patch(writer_type: typing.Type[Writer]) -> typing.Type[Writer]:
     """
     Creates a modified version of a writer type
@@ -88,11 +168,71 @@ def debug_patch(writer_type: typing.Type[Writer]) -> typing.Type[Writer]:
             try:
                 yield from super().dump_iter()
             except Exception as e:
-                buffer = io.StringIO()
-                buffer.write(''.join(map(str, e.args)))
-                buffer.write('\n\nWriter stack:\n')
-                print_writer_stack(self, buffer)
-                e.args = (buffer.getvalue(),)
+                add_writer_stack_info(self, e)
+                raise
+
+        if hasattr(writer_type, 'dump_aiter'):
+            async def dump_aiter(self):
+                try:
+                    async for chunk in super().dump_aiter():
+                        yield chunk
+                except Exception as e:
+                    add_writer_stack_info(self, e)
+                    raise
+
+    return PatchedWriter
+
+
+def lazy_debug_patch(writer_type: typing.Type[Writer]) -> typing.Type[Writer]:
+    """
+    Creates a modified version of a writer type which prints out
+    similar extra info to debug_patch when encountering an error,
+    but without any overhead per node processed.
+
+    Nothing is tracked while processing. Instead, when an error occurs,
+    the node behind each iterator in the writer's stack and the items
+    it has processed are worked out where possible using
+    recover_iteration_state.
+
+    :param writer_type: Base writer type.
+    :return: New child writer type with debug modifications.
+    """
+    class PatchedWriter(writer_type):
+        def dump_iter(self):
+            try:
+                yield from super().dump_iter()
+            except Exception as e:
+                add_writer_stack_info(self, e)
                 raise
 
+        if hasattr(writer_type, 'dump_aiter'):
+            async def dump_aiter(self):
+                try:
+                    async for chunk in super().dump_aiter():
+                        yield chunk
+                except Exception as e:
+                    add_writer_stack_info(self, e)
+                    raise
+
     return PatchedWriter
+
+
+def debug_writer_type(
+        writer_type: typing.Type[Writer],
+        debug: typing.Union[bool, str],
+) -> typing.Type[Writer]:
+    """
+    Applies the patch chosen using the debug parameter of
+    codenode.dump/dumps to a writer type.
+
+    :param writer_type: Base writer type.
+    :param debug: False for no patch, 'lazy' for lazy_debug_patch, or
+                  True for debug_patch.
+    :return: Writer type with the chosen patch applied.
+    """
+    if debug == 'lazy':
+        return lazy_debug_patch(writer_type)
+    elif debug:
+        return debug_patch(writer_type)
+    else:
+        return writer_type
@@ -0,0 +1,259 @@
+import typing
+
+from .writer import Writer
+from .nodes.newline import Newline
+from .nodes.indentation import Indentation
+from .nodes.depth_change import DepthChange
+from .nodes.frozen import FrozenNode
+from .nodes.line_prefix import LinePrefixChange
+from .nodes.writer_context import WriterContextNode
+from .nodes.buffer import NodeBuffer
+from .nodes.joined import Joined
+from .nodes.cacheable import CacheableNode
+
+if typing.TYPE_CHECKING:
+    from typing import Callable, Iterable, Optional
+    from .writer import NodeType
+    Handler = Callable[['FastWriter', typing.Any], Optional[str]]
+
+
+def handle_string(writer: 'FastWriter', node: str) -> str:
+    return node
+
+
+def handle_depth_change(writer: 'FastWriter', node: DepthChange):
+    writer.depth = node.new_depth_for(writer.depth)
+
+
+def handle_indentation(writer: 'FastWriter', node: Indentation) -> str:
+    indents = node.indents_for(writer.depth)
+    try:
+        return writer.indentation_cache[indents]
+    except KeyError:
+        return writer.get_indentation(indents)
+
+
+def handle_newline(writer: 'FastWriter', node: Newline) -> str:
+    return writer.newline
+
+
+def handle_frozen(writer: 'FastWriter', node: FrozenNode) -> str:
+    text, writer.depth, line_prefixes = node.render(
+        writer.indentation, writer.newline, writer.depth,
+        writer.line_prefixes,
+    )
+    if line_prefixes != writer.line_prefixes:
+        writer.line_prefixes = line_prefixes
+    return text
+
+
+def handle_line_prefix_change(writer: 'FastWriter', node: LinePrefixChange):
+    writer.line_prefixes = node.new_prefixes_for(
+        writer.line_prefixes, writer.depth,
+    )
+
+
+def handle_writer_context(writer: 'FastWriter', node: WriterContextNode):
+    writer.stack.push((node.node_for(writer),))
+
+
+def handle_node_buffer(writer: 'FastWriter', node: NodeBuffer):
+    writer.stack.push(node.chunks_for(writer))
+
+
+def handle_joined(writer: 'FastWriter', node: Joined):
+    writer.stack.push(node.parts())
+
+
+def handle_cacheable(
+        writer: 'FastWriter',
+        node: CacheableNode,
+) -> 'Optional[str]':
+    if writer.subtree_cache is None:
+        handle_iterable(writer, node)
+        return None
+    return writer.render_cached(node)
+
+
+def handle_iterable(writer: 'FastWriter', node: 'NodeType'):
+    try:
+        writer.stack.push(node)
+    except TypeError as error:
+        raise TypeError(
+            f'Unable to process node "{node}".\n'
+            'Either convert it to a string, iterable or '
+            'register a handler for nodes of this type using '
+            'FastWriter.register.'
+        ) from error
+
+
+class FastWriter(Writer):
+    """
+    A Writer that looks up how to process each node using its exact type
+    rather than a chain of isinstance checks, and renders the whole node
+    tree in a single flat loop that appends straight to an output list.
+
+    Produces the same output as Writer. Nodes of types without a
+    registered handler are looked up using their type's method
+    resolution order, so subclasses of registered types are handled by
+    their base type's handler. Anything else is treated as an iterable.
+
+    Custom node types can be handled by registering a handler using
+    FastWriter.register. Overriding process_node has no effect on
+    this writer.
+    """
+    handlers: 'dict[type, Handler]' = {
+        str: handle_string,
+        DepthChange: handle_depth_change,
+        Indentation: handle_indentation,
+        Newline: handle_newline,
+        FrozenNode: handle_frozen,
+        LinePrefixChange: handle_line_prefix_change,
+        WriterContextNode: handle_writer_context,
+        NodeBuffer: handle_node_buffer,
+        Joined: handle_joined,
+        CacheableNode: handle_cacheable,
+        object: handle_iterable,
+    }
+    """
+    Mapping of node types to handler functions.
+    Each handler is called with the writer and a node, and returns
+    either a string chunk to output or None. Handlers may push new
+    nodes onto the writer's stack to have them processed next.
+    """
+
+    batch_size = 4096
+    "Number of chunks joined together into each string from dump_iter."
+
+    def __init__(
+            self,
+            node: 'NodeType', *,
+            indentation='    ',
+            newline='\n',
+            depth=0,
+    ):
+        """
+        :param node: Base node of node tree.
+        :param indentation: Initial string used for indents in the output.
+        :param newline: Initial string used for newlines in the output.
+        :param depth: Base depth (i.e. number of indents) to start at.
+        """
+        super().__init__(
+            node,
+            indentation=indentation,
+            newline=newline,
+            depth=depth,
+        )
+        self.resolved_handlers = dict(self.handlers)
+        """
+        Copy of the handler table, extended with the handlers found for
+        each subclass encountered while processing.
+        """
+
+    @classmethod
+    def register(cls, node_type: type) -> 'Callable[[Handler], Handler]':
+        """
+        Returns a decorator which registers a function as the handler
+        for nodes of a given type on this writer type and its subclasses.
+
+        for example:
+
+        - ``@FastWriter.register(MyNode)`` above
+          ``def handle_my_node(writer, node): ...``
+
+        :param node_type: Type of nodes to be handled.
+        :return: Decorator that registers a handler function.
+        """
+        def decorator(handler: 'Handler') -> 'Handler':
+            # copy on first registration so handlers added to a subclass
+            # don't leak into its base types.
+            if 'handlers' not in vars(cls):
+                cls.handlers = dict(cls.handlers)
+            cls.handlers[node_type] = handler
+            return handler
+        return decorator
+
+    def resolve_handler(self, node_type: type) -> 'Handler':
+        """
+        Find the handler for a node type without an exact match in the
+        handler table, using the type's method resolution order.
+
+        :param node_type: Type of node.
+        :return: Handler function for nodes of that type.
+        """
+        handlers = self.handlers
+        for base in node_type.__mro__:
+            try:
+                return handlers[base]
+            except KeyError:
+                continue
+        return handle_iterable
+
+    def render_into(self, output: list, limit: 'Optional[int]' = None):
+        """
+        Process the node tree, appending string chunks to a list.
+
+        :param output: List that chunks are appended to.
+        :param limit: If given, stop after at least this many chunks have
+                      been appended. Calling this method again resumes
+                      processing where it stopped.
+        """
+        items = self.stack.items
+        handlers = self.resolved_handlers
+        get_handler = handlers.get
+        append = output.append
+        if limit is None:
+            limit = float('inf')
+        else:
+            limit += len(output)
+
+        while items:
+            top = items[-1]
+            for node in top:
+                node_type = type(node)
+                if node_type is str:
+                    append(node)
+                    if len(output) >= limit:
+                        # the iterator stays on the stack, so the next
+                        # call resumes from the following node.
+                        return
+                    continue
+
+                handler = get_handler(node_type)
+                if handler is None:
+                    handler = handlers[node_type] = \
+                        self.resolve_handler(node_type)
+
+                chunk = handler(self, node)
+                if chunk is not None:
+                    append(chunk)
+                    if len(output) >= limit:
+                        return
+                if items[-1] is not top:
+                    # a new node was pushed, process it first.
+                    break
+            else:
+                items.pop()
+
+    def dump_iter(self) -> 'Iterable[str]':
+        """
+        Process and write out a node tree as an iterable of
+        string chunks. Chunks are joined together in batches.
+
+        :return: Iterable of string chunks.
+        """
+        output = []
+        batch_size = self.batch_size
+        while self.stack.items:
+            self.render_into(output, batch_size)
+            if output:
+                yield ''.join(output)
+                output.clear()
+
+    def dumps(self):
+        """
+        Process and write out a node tree as a string.
+
+        :return: String representation of node tree.
+        """
+        return ''.join(self.dump_iter())
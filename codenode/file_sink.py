@@ -0,0 +1,212 @@
+import codecs
+import mmap
+import os
+import shutil
+import typing
+
+if typing.TYPE_CHECKING:
+    from typing import BinaryIO, Optional, Union
+    PathType = Union[str, os.PathLike]
+
+
+def open_temp_file(path: 'PathType') -> 'tuple[BinaryIO, str]':
+    """
+    Create a temporary file in the same directory as a path, so that it
+    can replace the file at that path using os.replace once written.
+
+    :param path: Path of file to be replaced.
+    :return: Tuple containing the temporary file, opened for reading and
+             writing in binary mode, and its path.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    while True:
+        temp_path = os.path.join(
+            directory, f'.{name}.{os.urandom(4).hex()}.tmp',
+        )
+        try:
+            return open(temp_path, 'x+b'), temp_path
+        except FileExistsError:
+            continue
+
+
+def replace_file(temp_path: str, path: 'PathType'):
+    """
+    Replace a file with a temporary file created by open_temp_file,
+    keeping the original file's permissions. The temporary file is
+    removed if this fails.
+
+    :param temp_path: Path of the temporary file.
+    :param path: Path of file to replace.
+    """
+    try:
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class ChangedFileSink:
+    """
+    Stream which writes output to a file only if it differs from the
+    file's existing contents.
+
+    Chunks written to the sink are encoded then compared against the
+    existing file, which is read through mmap. Nothing is written until
+    the first difference is found. At that point, the matching part of
+    the existing file and the rest of the output are written to a
+    temporary file in the same directory, which replaces the original
+    file once the sink is closed. If the output is the same as the
+    existing file, the file is only read.
+
+    Output is written as is, without translating newlines.
+    Intended to be used as a context manager, so that the temporary
+    file is removed if an error occurs.
+    """
+    def __init__(
+            self,
+            path: 'PathType', *,
+            encoding='utf-8',
+            errors='strict',
+    ):
+        """
+        :param path: Path of file to write to.
+        :param encoding: Encoding used for the output.
+        :param errors: Error handling scheme used when encoding,
+                       i.e. 'strict', 'replace' or 'ignore'.
+        """
+        self.path = path
+        "Path of file to write to."
+        self.encode = codecs.getincrementalencoder(encoding)(errors).encode
+        "Incremental encoder used for each chunk written."
+        self.position = 0
+        "Number of bytes of output matching the existing file so far."
+        self.changed = False
+        "True once the output is known to differ from the existing file."
+        self.closed = False
+        "True once the sink has been closed or discarded."
+
+        self.existing: 'Optional[mmap.mmap]' = None
+        "Memory map of the existing file, if it exists and isn't empty."
+        self.temp_file: 'Optional[BinaryIO]' = None
+        "Temporary file output is written to once it has changed."
+        self.temp_path: 'Optional[str]' = None
+        "Path of the temporary file."
+        self.exists = True
+        "True if the file existed when the sink was created."
+
+        try:
+            with open(path, 'rb') as file:
+                if os.fstat(file.fileno()).st_size:
+                    self.existing = mmap.mmap(
+                        file.fileno(), 0, access=mmap.ACCESS_READ,
+                    )
+        except FileNotFoundError:
+            self.exists = False
+
+    @property
+    def existing_size(self) -> int:
+        """
+        Size in bytes of the existing file.
+        """
+        return 0 if self.existing is None else len(self.existing)
+
+    def start_writing(self):
+        """
+        Open a temporary file and write the part of the existing file
+        that matched the output so far to it.
+        """
+        self.temp_file, self.temp_path = open_temp_file(self.path)
+        self.changed = True
+        if self.position:
+            # written through a view so the matching part isn't copied.
+            with memoryview(self.existing) as view, \
+                    view[:self.position] as matched:
+                self.temp_file.write(matched)
+
+    def write_bytes(self, data: bytes):
+        """
+        Write some encoded output.
+
+        :param data: Encoded output.
+        """
+        if not self.changed:
+            end = self.position + len(data)
+            if end <= self.existing_size and \
+                    self.existing[self.position:end] == data:
+                self.position = end
+                return
+            self.start_writing()
+        self.temp_file.write(data)
+
+    def write(self, chunk: str):
+        """
+        Write a chunk of output.
+
+        :param chunk: String chunk.
+        """
+        data = self.encode(chunk)
+        if data:
+            self.write_bytes(data)
+
+    def close(self) -> bool:
+        """
+        Finish writing. If the output differs from the existing file,
+        the temporary file replaces it. Does nothing if already closed.
+
+        :return: True if the file was written.
+        """
+        if self.closed:
+            return self.changed
+
+        try:
+            tail = self.encode('', True)
+            if tail:
+                self.write_bytes(tail)
+            if not self.changed and (
+                    self.position != self.existing_size or not self.exists
+            ):
+                # output ended early, or there was no file to match.
+                self.start_writing()
+        except BaseException:
+            self.discard()
+            raise
+
+        self.close_files()
+        if self.changed:
+            replace_file(self.temp_path, self.path)
+        return self.changed
+
+    def discard(self):
+        """
+        Stop writing, leaving the existing file as it is and removing
+        the temporary file if there is one.
+        """
+        if self.closed:
+            return
+        self.close_files()
+        if self.temp_path is not None:
+            os.remove(self.temp_path)
+
+    def close_files(self):
+        """
+        Close the memory map of the existing file and the temporary file.
+        """
+        self.closed = True
+        if self.existing is not None:
+            self.existing.close()
+        if self.temp_file is not None:
+            self.temp_file.close()
+
+    def __enter__(self) -> 'ChangedFileSink':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __repr__(self):
+        return f'<ChangedFileSink {os.fspath(self.path)!r}>'
@@ -0,0 +1,253 @@
+import array
+import bisect
+import typing
+import weakref
+
+from .nodes.newline import Newline
+from .nodes.indentation import Indentation
+from .nodes.depth_change import DepthChange
+from .nodes.frozen import FrozenNode
+from .nodes.line_prefix import prefixed_indentation
+
+if typing.TYPE_CHECKING:
+    from typing import Iterable
+    from .nodes.line_prefix import LinePrefixes
+
+
+def find_newline(string: str, count: int) -> int:
+    """
+    :param string: Any string.
+    :param count: Number of newlines to find, at least 1.
+    :return: Index of the nth newline character in the string.
+    """
+    index = -1
+    for _ in range(count):
+        index = string.index('\n', index + 1)
+    return index
+
+
+def slice_lines(
+        chunks: 'Iterable[str]',
+        start: int,
+        end: int,
+        line=0,
+) -> 'Iterable[str]':
+    """
+    Select a range of lines from some output. Lines are counted by
+    newline characters, so a line ending with '\\r\\n' counts as one line.
+
+    :param chunks: Iterable of string chunks.
+    :param start: Index of the first line to include.
+    :param end: Index of the line to stop before.
+    :param line: Index of the line the first chunk starts on.
+    :return: Iterable of string chunks containing only lines from start
+             up to end, including their newlines. Stops consuming chunks
+             once the end is reached.
+    """
+    if start >= end:
+        return
+
+    for chunk in chunks:
+        newlines = chunk.count('\n')
+        if line < start:
+            if line + newlines < start:
+                line += newlines
+                continue
+            chunk = chunk[find_newline(chunk, start - line) + 1:]
+            newlines -= start - line
+            line = start
+
+        if line + newlines >= end:
+            yield chunk[:find_newline(chunk, end - line) + 1]
+            return
+
+        if chunk:
+            yield chunk
+        line += newlines
+
+
+class LineIndex:
+    """
+    Index of the lines in the output of a frozen node tree, used to
+    render any range of lines without processing the rest of the tree.
+
+    The tree's operations are walked once on creation, recording the
+    line and depth each operation starts at. Rendering a range of lines
+    then only processes the operations that output them, so it takes
+    time proportional to the size of the range rather than the output.
+    """
+    def __init__(
+            self,
+            node, *,
+            indentation='    ',
+            newline='\n',
+            depth=0,
+    ):
+        """
+        :param node: Frozen node, or a node tree which is frozen first.
+        :param indentation: String used for indents in the output.
+        :param newline: String used for newlines in the output.
+        :param depth: Base depth (i.e. number of indents) to start at.
+        """
+        if not isinstance(node, FrozenNode):
+            node = FrozenNode(node)
+        self.node = node
+        "Frozen node tree that is indexed."
+        self.indentation = indentation
+        "String used for indents in the output."
+        self.newline = newline
+        "String used for newlines in the output."
+
+        self.line_starts = array.array('Q')
+        "Index of the line each operation starts on."
+        self.depths = array.array('q')
+        "Depth before each operation is processed."
+        self.prefix_operations = array.array('Q', (0,))
+        "Indices of operations at which the line prefixes change."
+        self.prefixes: 'list[LinePrefixes]' = [()]
+        "Line prefixes from each index in prefix_operations onwards."
+        self.line_count = 0
+        """
+        Number of newline characters in the output, i.e. the number of
+        complete lines.
+        """
+
+        line = 0
+        line_prefixes = ()
+        newline_count = newline.count('\n')
+        indentation_counts = {}
+        append_line = self.line_starts.append
+        append_depth = self.depths.append
+        for index, operation in enumerate(node.operations):
+            append_line(line)
+            append_depth(depth)
+            if type(operation) is str:
+                line += operation.count('\n')
+            elif isinstance(operation, DepthChange):
+                depth = operation.new_depth_for(depth)
+            elif isinstance(operation, Indentation):
+                indents = operation.indents_for(depth)
+                try:
+                    line += indentation_counts[indents]
+                except KeyError:
+                    count = indentation_counts[indents] = \
+                        prefixed_indentation(
+                            indentation, indents, line_prefixes,
+                        ).count('\n')
+                    line += count
+            elif isinstance(operation, Newline):
+                line += newline_count
+            else:
+                line_prefixes = operation.new_prefixes_for(
+                    line_prefixes, depth,
+                )
+                indentation_counts = {}
+                self.prefix_operations.append(index + 1)
+                self.prefixes.append(line_prefixes)
+        self.line_count = line
+
+    @classmethod
+    def of(
+            cls,
+            node: FrozenNode, *,
+            indentation='    ',
+            newline='\n',
+            depth=0,
+    ) -> 'LineIndex':
+        """
+        Get a shared index of a frozen node, creating it on first use.
+        Indexes are kept for as long as the frozen node exists.
+
+        :param node: Frozen node.
+        :param indentation: String used for indents in the output.
+        :param newline: String used for newlines in the output.
+        :param depth: Base depth (i.e. number of indents) to start at.
+        :return: Line index.
+        """
+        try:
+            indexes = shared_indexes[node]
+        except KeyError:
+            indexes = shared_indexes[node] = {}
+
+        key = indentation, newline, depth
+        try:
+            return indexes[key]
+        except KeyError:
+            index = indexes[key] = cls(
+                node,
+                indentation=indentation,
+                newline=newline,
+                depth=depth,
+            )
+            return index
+
+    def chunks_from(self, index: int) -> 'Iterable[str]':
+        """
+        Process operations starting from an index.
+
+        :param index: Index of the first operation to process.
+        :return: Iterable of string chunks.
+        """
+        operations = self.node.operations
+        if index >= len(operations):
+            return
+
+        indentation = self.indentation
+        newline = self.newline
+        depth = self.depths[index]
+        line_prefixes = self.prefixes[
+            bisect.bisect_right(self.prefix_operations, index) - 1
+        ]
+        indentation_strings = {}
+        for operation in map(
+                operations.__getitem__, range(index, len(operations)),
+        ):
+            if type(operation) is str:
+                yield operation
+            elif isinstance(operation, DepthChange):
+                depth = operation.new_depth_for(depth)
+            elif isinstance(operation, Indentation):
+                indents = operation.indents_for(depth)
+                try:
+                    yield indentation_strings[indents]
+                except KeyError:
+                    string = indentation_strings[indents] = \
+                        prefixed_indentation(
+                            indentation, indents, line_prefixes,
+                        )
+                    yield string
+            elif isinstance(operation, Newline):
+                yield newline
+            else:
+                line_prefixes = operation.new_prefixes_for(
+                    line_prefixes, depth,
+                )
+                indentation_strings = {}
+
+    def dumps_range(self, start: int, end: int) -> str:
+        """
+        Render a range of lines.
+
+        :param start: Index of the first line to include.
+        :param end: Index of the line to stop before.
+        :return: Lines from start up to end, including their newlines.
+        """
+        start = max(start, 0)
+        # start from the last operation beginning before the first line,
+        # since its output may continue onto it.
+        index = max(bisect.bisect_left(self.line_starts, start) - 1, 0)
+        line = self.line_starts[index] if self.line_starts else 0
+        return ''.join(
+            slice_lines(self.chunks_from(index), start, end, line)
+        )
+
+    def __len__(self):
+        return self.line_count
+
+    def __repr__(self):
+        return f'<LineIndex ({self.line_count} lines)>'
+
+
+shared_indexes: 'weakref.WeakKeyDictionary[FrozenNode, dict]' = \
+    weakref.WeakKeyDictionary()
+"Line indexes returned by LineIndex.of, keyed by frozen node."
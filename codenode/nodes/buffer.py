@@ -0,0 +1,258 @@
+import array
+import contextlib
+import typing
+
+from .depth_change import RelativeDepthChange
+from .indentation import CurrentIndentation
+from .newline import Newline
+
+if typing.TYPE_CHECKING:
+    from typing import Iterable, Iterator, Optional
+    from ..writer import Writer
+
+STRING = 0
+NEWLINE = 1
+INDENTATION = 2
+INDENT = 3
+DEDENT = 4
+NODE = 5
+
+indent = RelativeDepthChange.of(1)
+dedent = RelativeDepthChange.of(-1)
+indentation = CurrentIndentation.of()
+newline = Newline.of()
+
+
+class NodeBuffer:
+    """
+    A compact, append-only node made up of lines, indents and dedents.
+
+    Rather than a tree of tuples, the contents are stored as one byte per
+    operation, along with a list of the strings written in order.
+    Writers process node buffers directly, joining the output of many
+    lines together at once.
+
+    With intern_strings, repeated strings are only stored once, and an
+    index into the list of strings is stored for each string instead.
+    This saves memory when many lines repeat the same strings, but the
+    indices and the table used to find repeats cost more than they save
+    when most strings are unique, so it is off by default.
+
+    Other nodes can be appended too, and are processed by the writer as
+    usual in between the buffer's own output.
+    """
+    batch_size = 1024
+    "Number of lines joined together into each chunk of output."
+
+    def __init__(self, intern_strings=False):
+        """
+        :param intern_strings: If True, repeated strings are only stored
+                               once.
+        """
+        self.opcodes = array.array('B')
+        "One byte for each operation, in the order they are processed."
+        self.strings: 'list[str]' = []
+        """
+        Strings written to the buffer, in order, or without repeats if
+        intern_strings was True.
+        """
+        self.string_indices: 'Optional[array.array]' = \
+            array.array('I') if intern_strings else None
+        """
+        Index into strings for each string operation, in order.
+        None unless intern_strings was True.
+        """
+        self.string_table: 'Optional[dict[str, int]]' = \
+            {} if intern_strings else None
+        """
+        Index of each string in strings, used to avoid repeats.
+        None unless intern_strings was True.
+        """
+        self.nodes: 'list' = []
+        "Other nodes appended to the buffer, in order."
+
+    def write(self, string: str) -> 'NodeBuffer':
+        """
+        Append a string.
+
+        :param string: String to output.
+        :return: This buffer, for chaining.
+        """
+        string_table = self.string_table
+        if string_table is None:
+            self.strings.append(string)
+        else:
+            try:
+                index = string_table[string]
+            except KeyError:
+                index = string_table[string] = len(self.strings)
+                self.strings.append(string)
+            self.string_indices.append(index)
+        self.opcodes.append(STRING)
+        return self
+
+    def append(self, node) -> 'NodeBuffer':
+        """
+        Append any node. Strings and the shared built-in indent, dedent,
+        indentation and newline nodes are stored compactly, anything else
+        is kept as is.
+
+        :param node: Node to append.
+        :return: This buffer, for chaining.
+        """
+        if type(node) is str:
+            return self.write(node)
+        elif node is newline:
+            self.opcodes.append(NEWLINE)
+        elif node is indentation:
+            self.opcodes.append(INDENTATION)
+        elif node is indent:
+            self.opcodes.append(INDENT)
+        elif node is dedent:
+            self.opcodes.append(DEDENT)
+        else:
+            self.opcodes.append(NODE)
+            self.nodes.append(node)
+        return self
+
+    def line(self, content) -> 'NodeBuffer':
+        """
+        Append a line, i.e. indentation, some content and a newline.
+
+        :param content: Content of line.
+        :return: This buffer, for chaining.
+        """
+        self.opcodes.append(INDENTATION)
+        self.append(content)
+        self.opcodes.append(NEWLINE)
+        return self
+
+    def lines(self, *items) -> 'NodeBuffer':
+        """
+        Append several lines.
+
+        :param items: Contents of lines.
+        :return: This buffer, for chaining.
+        """
+        for item in items:
+            self.line(item)
+        return self
+
+    def empty_lines(self, count: int) -> 'NodeBuffer':
+        """
+        Append newlines.
+
+        :param count: Number of newlines.
+        :return: This buffer, for chaining.
+        """
+        self.opcodes.extend(array.array('B', (NEWLINE,)) * count)
+        return self
+
+    def indent(self) -> 'NodeBuffer':
+        """
+        Increase the depth of following lines by one.
+
+        :return: This buffer, for chaining.
+        """
+        self.opcodes.append(INDENT)
+        return self
+
+    def dedent(self) -> 'NodeBuffer':
+        """
+        Decrease the depth of following lines by one.
+
+        :return: This buffer, for chaining.
+        """
+        self.opcodes.append(DEDENT)
+        return self
+
+    @contextlib.contextmanager
+    def indented(self) -> 'Iterator[NodeBuffer]':
+        """
+        Context manager which indents lines appended inside it.
+
+        :return: Context manager yielding this buffer.
+        """
+        self.indent()
+        try:
+            yield self
+        finally:
+            self.dedent()
+
+    def iter_strings(self) -> 'Iterator[str]':
+        """
+        :return: Iterator of the string of each string operation,
+                 in order.
+        """
+        if self.string_indices is None:
+            return iter(self.strings)
+        return map(self.strings.__getitem__, self.string_indices)
+
+    def chunks_for(self, writer: 'Writer') -> 'Iterable':
+        """
+        Process this buffer's operations using the settings and depth of
+        a writer. Used by writers to process node buffers.
+
+        :param writer: Writer processing this buffer.
+        :return: Iterable of string chunks, along with any other nodes
+                 appended to the buffer, which the writer processes as
+                 usual before continuing.
+        """
+        next_string = self.iter_strings().__next__
+        next_node = iter(self.nodes).__next__
+        get_indentation = writer.get_indentation
+        batch_size = self.batch_size
+
+        output = []
+        append = output.append
+        lines = 0
+        for opcode in self.opcodes:
+            if opcode == STRING:
+                append(next_string())
+            elif opcode == INDENTATION:
+                append(get_indentation(writer.depth))
+            elif opcode == NEWLINE:
+                append(writer.newline)
+                lines += 1
+                if lines >= batch_size:
+                    yield ''.join(output)
+                    output.clear()
+                    lines = 0
+            elif opcode == INDENT:
+                writer.depth += 1
+            elif opcode == DEDENT:
+                writer.depth -= 1
+            else:
+                if output:
+                    yield ''.join(output)
+                    output.clear()
+                yield next_node()
+
+        if output:
+            yield ''.join(output)
+
+    def __iter__(self):
+        """
+        :return: Iterable of the nodes this buffer is equivalent to.
+        """
+        next_string = self.iter_strings().__next__
+        next_node = iter(self.nodes).__next__
+        for opcode in self.opcodes:
+            if opcode == STRING:
+                yield next_string()
+            elif opcode == INDENTATION:
+                yield indentation
+            elif opcode == NEWLINE:
+                yield newline
+            elif opcode == INDENT:
+                yield indent
+            elif opcode == DEDENT:
+                yield dedent
+            else:
+                yield next_node()
+
+    def __repr__(self):
+        return (
+            f'<NodeBuffer ({len(self.opcodes)} operations, '
+            f'{len(self.strings)} strings)>'
+        )
@@ -0,0 +1,25 @@
+import typing
+
+if typing.TYPE_CHECKING:
+    from typing import Hashable, Optional
+
+
+class CacheableNode:
+    """
+    Nodes whose output can be stored and reused by writers with a
+    subtree cache, instead of processing the node again.
+
+    Nodes are processed as iterables as usual when there is no subtree
+    cache, or when their cache key is None.
+    """
+    def cache_key(self) -> 'Optional[Hashable]':
+        """
+        Method used to get the key identifying this node's output. Nodes
+        with equal keys are assumed to produce the same output, so the
+        key should change whenever the output would, i.e. by including a
+        version number or a hash of whatever the output is built from.
+
+        :return: Hashable key, or None if this node's output should not
+                 be cached.
+        """
+        raise NotImplementedError
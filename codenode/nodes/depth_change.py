@@ -1,7 +1,14 @@
-class DepthChange:
+import functools
+
+from .immutable import ImmutableNode
+
+
+class DepthChange(ImmutableNode):
     """
     Nodes that represent a change in indentation depth.
     """
+    __slots__ = ()
+
     def new_depth_for(self, depth: int) -> int:
         """
         Method used to calculate the new depth based on the current one.
@@ -17,6 +24,8 @@ class RelativeDepthChange(DepthChange):
     Nodes that represent a change in indentation depth relative to the
     current depth by some preset amount.
     """
+    __slots__ = ('offset',)
+
     def __init__(self, offset: int):
         """
         :param offset: Amount by which to increase/decrease depth.
@@ -27,6 +36,15 @@ class RelativeDepthChange(DepthChange):
         processed.
         """
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def of(cls, offset: int) -> 'RelativeDepthChange':
+        """
+        :param offset: Amount by which to increase/decrease depth.
+        :return: Shared instance with the given offset.
+        """
+        return cls(offset)
+
     def new_depth_for(self, depth: int) -> int:
         return depth + self.offset
 
@@ -39,6 +57,8 @@ class AbsoluteDepthChange(DepthChange):
     Nodes that represent a change in indentation depth without taking
     the current depth into account.
     """
+    __slots__ = ('value',)
+
     def __init__(self, value: int):
         """
         :param value: Value to set depth to.
@@ -49,6 +69,15 @@ class AbsoluteDepthChange(DepthChange):
         processed.
         """
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def of(cls, value: int) -> 'AbsoluteDepthChange':
+        """
+        :param value: Value to set depth to.
+        :return: Shared instance with the given value.
+        """
+        return cls(value)
+
     def new_depth_for(self, depth: int) -> int:
         return self.value
 
@@ -0,0 +1,155 @@
+import typing
+
+from .newline import Newline
+from .indentation import Indentation
+from .depth_change import DepthChange
+from .line_prefix import LinePrefixChange, prefixed_indentation
+
+if typing.TYPE_CHECKING:
+    from typing import Iterable, Union
+    from .line_prefix import LinePrefixes
+    Operation = Union[
+        str, DepthChange, Indentation, Newline, LinePrefixChange,
+    ]
+
+
+class FrozenNode:
+    """
+    Nodes that hold a pre-processed copy of a node tree.
+
+    The tree is walked once on creation. Runs of strings are joined
+    together and everything else is flattened into a compact list of
+    operations, so processing a frozen node again costs about as much as
+    a few string joins. Output still depends on the indentation, newline
+    and depth of the writer processing it.
+
+    The most recent outputs are memoized, so dumping a frozen node
+    repeatedly with the same settings is a single lookup.
+    """
+    cache_size = 8
+    "Number of rendered outputs to keep per frozen node."
+
+    def __init__(self, node):
+        """
+        :param node: Node tree to freeze. Must contain only strings,
+                     iterables, frozen nodes and the built-in node types.
+        """
+        self.operations: 'tuple[Operation, ...]' = tuple(self.flatten(node))
+        """
+        Strings and depth change, indentation, newline and line prefix
+        change nodes in the order they are processed.
+        """
+
+        self.cache: 'dict[tuple, tuple[str, int, LinePrefixes]]' = {}
+        """
+        Memoized results of render, keyed by its arguments.
+        """
+
+    @staticmethod
+    def flatten(node) -> 'Iterable[Operation]':
+        """
+        Walk a node tree, yielding the operations used to process it.
+        Adjacent strings are joined together.
+
+        :param node: Node tree to walk.
+        :return: Iterable of operations.
+        """
+        strings = []
+        stack = [iter((node,))]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, str):
+                    strings.append(item)
+                elif isinstance(item, (
+                        DepthChange, Indentation, Newline, LinePrefixChange,
+                )):
+                    if strings:
+                        yield ''.join(strings)
+                        strings.clear()
+                    yield item
+                elif isinstance(item, FrozenNode):
+                    stack.append(iter(item.operations))
+                    break
+                else:
+                    try:
+                        stack.append(iter(item))
+                    except TypeError as error:
+                        raise TypeError(
+                            f'Unable to freeze node "{item}".\n'
+                            'Either convert it to a string or iterable.'
+                        ) from error
+                    break
+            else:
+                stack.pop()
+
+        if strings:
+            yield ''.join(strings)
+
+    def render(
+            self,
+            indentation: str,
+            newline: str,
+            depth: int,
+            line_prefixes: 'LinePrefixes' = (),
+    ) -> 'tuple[str, int, LinePrefixes]':
+        """
+        Process this node's operations.
+
+        :param indentation: String used for indents in the output.
+        :param newline: String used for newlines in the output.
+        :param depth: Depth at which this node is processed.
+        :param line_prefixes: Line prefixes at the point this node is
+                              processed.
+        :return: Tuple containing the output string, the depth after
+                 processing and the line prefixes after processing.
+        """
+        key = indentation, newline, depth, line_prefixes
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        indentation_strings = {}
+        chunks = []
+        append = chunks.append
+        for operation in self.operations:
+            if type(operation) is str:
+                append(operation)
+            elif isinstance(operation, DepthChange):
+                depth = operation.new_depth_for(depth)
+            elif isinstance(operation, Indentation):
+                indents = operation.indents_for(depth)
+                try:
+                    append(indentation_strings[indents])
+                except KeyError:
+                    string = indentation_strings[indents] = \
+                        prefixed_indentation(
+                            indentation, indents, line_prefixes,
+                        )
+                    append(string)
+            elif isinstance(operation, Newline):
+                append(newline)
+            else:
+                line_prefixes = operation.new_prefixes_for(
+                    line_prefixes, depth,
+                )
+                indentation_strings = {}
+
+        result = ''.join(chunks), depth, line_prefixes
+        cache = self.cache
+        if len(cache) >= self.cache_size:
+            # evict the oldest entry. Frozen nodes may be shared between
+            # threads (i.e. by dump_many), so another thread may evict
+            # the same entry or change the cache while it is looked up.
+            try:
+                cache.pop(next(iter(cache), None), None)
+            except RuntimeError:
+                pass
+        cache[key] = result
+        return result
+
+    def __iter__(self):
+        return iter(self.operations)
+
+    def __repr__(self):
+        return f'<FrozenNode ({len(self.operations)} operations)>'
@@ -0,0 +1,21 @@
+class ImmutableNode:
+    """
+    Nodes whose attributes can't be changed once they have been set,
+    so that a single instance can be shared between any number of
+    node trees.
+    """
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value):
+        if hasattr(self, name):
+            raise AttributeError(
+                f'Unable to set "{name}", '
+                f'{type(self).__name__} nodes are immutable.'
+            )
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str):
+        raise AttributeError(
+            f'Unable to delete "{name}", '
+            f'{type(self).__name__} nodes are immutable.'
+        )
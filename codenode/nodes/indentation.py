@@ -1,7 +1,14 @@
-class Indentation:
+import functools
+
+from .immutable import ImmutableNode
+
+
+class Indentation(ImmutableNode):
     """
     Nodes that represent indentation whitespace at the start of a line.
     """
+    __slots__ = ()
+
     def indents_for(self, depth: int) -> int:
         """
         :param depth: Current depth.
@@ -17,6 +24,8 @@ class RelativeIndentation(Indentation):
     with a number of indents relative to the current depth by some
     preset amount.
     """
+    __slots__ = ('offset',)
+
     def __init__(self, offset: int):
         """
         :param offset: Amount of indents relative to the current depth.
@@ -27,6 +36,15 @@ class RelativeIndentation(Indentation):
         output when this node is processed.
         """
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def of(cls, offset: int) -> 'RelativeIndentation':
+        """
+        :param offset: Amount of indents relative to the current depth.
+        :return: Shared instance with the given offset.
+        """
+        return cls(offset)
+
     def indents_for(self, depth: int) -> int:
         return depth + self.offset
 
@@ -39,6 +57,8 @@ class AbsoluteIndentation(Indentation):
     Nodes that represent indentation whitespace at the start of a line,
     with a number of indents independent of the current depth.
     """
+    __slots__ = ('value',)
+
     def __init__(self, value: int):
         """
         :param value: Amount of indents.
@@ -48,6 +68,15 @@ class AbsoluteIndentation(Indentation):
         Amount of indents that will be output when this node is processed.
         """
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def of(cls, value: int) -> 'AbsoluteIndentation':
+        """
+        :param value: Amount of indents.
+        :return: Shared instance with the given value.
+        """
+        return cls(value)
+
     def indents_for(self, depth: int) -> int:
         return self.value
 
@@ -60,6 +89,16 @@ class CurrentIndentation(Indentation):
     Nodes that represent indentation whitespace at the start of a line,
     with a number of indents equal to the current depth.
     """
+    __slots__ = ()
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def of(cls) -> 'CurrentIndentation':
+        """
+        :return: Shared instance.
+        """
+        return cls()
+
     def indents_for(self, depth: int) -> int:
         return depth
 
@@ -0,0 +1,89 @@
+import typing
+
+if typing.TYPE_CHECKING:
+    from typing import Iterable
+
+sentinel = object()
+
+
+class Joined:
+    """
+    Nodes that represent a starting node, then a sequence of nodes with a
+    separator between each one, then an ending node.
+
+    Iterating a joined node yields each node in turn, so node
+    transformers see every item. Writers process it using parts instead:
+    when the nodes are a list or tuple of strings and the separator is a
+    string too, they are joined together using a single str.join. Other
+    lists and tuples, i.e. with the default newline separator, have the
+    separators placed between them in a single list.
+    """
+    def __init__(self, nodes: 'Iterable', start, separator, end):
+        """
+        :param nodes: Sequence of nodes in the middle.
+        :param start: Node at the start.
+        :param separator: Node repeated between middle nodes.
+        :param end: Node at the end.
+        """
+        self.nodes = nodes
+        "Sequence of nodes in the middle."
+        self.start = start
+        "Node at the start."
+        self.separator = separator
+        "Node repeated between middle nodes."
+        self.end = end
+        "Node at the end."
+
+    def parts(self) -> 'Iterable':
+        """
+        :return: If the nodes are a list or tuple of strings and the
+                 separator is a string, a tuple containing the start,
+                 the nodes and separators joined into a single string,
+                 then the end. For other lists and tuples, a list of the
+                 start, each node with separators in between, then the
+                 end. Otherwise, an iterable which yields each node
+                 in turn.
+        """
+        nodes = self.nodes
+        separator = self.separator
+        if type(nodes) not in (list, tuple):
+            return self.stream()
+        if not nodes:
+            return self.start,
+
+        if type(separator) is str:
+            try:
+                return self.start, separator.join(nodes), self.end
+            except TypeError:
+                # not every node is a string.
+                pass
+
+        parts = [separator] * (2 * len(nodes) + 1)
+        parts[0] = self.start
+        parts[1::2] = nodes
+        parts[-1] = self.end
+        return parts
+
+    def stream(self) -> 'Iterable':
+        """
+        :return: Iterable which yields the start, each node with
+                 separators in between, then the end.
+        """
+        iterator = iter(self.nodes)
+        item = next(iterator, sentinel)
+
+        yield self.start
+
+        while item is not sentinel:
+            yield item
+            item = next(iterator, sentinel)
+            if item is not sentinel:
+                yield self.separator
+            else:
+                yield self.end
+
+    def __iter__(self):
+        return iter(self.stream())
+
+    def __repr__(self):
+        return f'<Joined {self.nodes!r}>'
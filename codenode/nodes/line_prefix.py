@@ -0,0 +1,105 @@
+import functools
+import typing
+
+from .immutable import ImmutableNode
+
+LinePrefixes = typing.Tuple[typing.Tuple[int, str], ...]
+
+
+class LinePrefixChange(ImmutableNode):
+    """
+    Nodes that represent a change in the strings placed at the start of
+    lines. Each prefix is placed after the indentation for the depth at
+    which it was added, followed by any further indentation.
+    """
+    __slots__ = ()
+
+    def new_prefixes_for(
+            self,
+            prefixes: LinePrefixes,
+            depth: int,
+    ) -> LinePrefixes:
+        """
+        Method used to calculate the new line prefixes based on the
+        current ones.
+
+        :param prefixes: Current prefixes, each paired with the depth at
+                         which it was added.
+        :param depth: Current depth.
+        :return: New prefixes.
+        """
+        raise NotImplementedError
+
+
+class PushLinePrefix(LinePrefixChange):
+    """
+    Nodes that represent a prefix being added to the start of lines,
+    after the indentation for the current depth.
+    """
+    __slots__ = ('prefix',)
+
+    def __init__(self, prefix: str):
+        """
+        :param prefix: String to place at the start of lines.
+        """
+        self.prefix = prefix
+        "String placed at the start of lines when this node is processed."
+
+    def new_prefixes_for(
+            self,
+            prefixes: LinePrefixes,
+            depth: int,
+    ) -> LinePrefixes:
+        return prefixes + ((depth, self.prefix),)
+
+    def __repr__(self):
+        return f'<PushLinePrefix {self.prefix!r}>'
+
+
+class PopLinePrefix(LinePrefixChange):
+    """
+    Nodes that represent the most recently added line prefix being removed.
+    """
+    __slots__ = ()
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def of(cls) -> 'PopLinePrefix':
+        """
+        :return: Shared instance.
+        """
+        return cls()
+
+    def new_prefixes_for(
+            self,
+            prefixes: LinePrefixes,
+            depth: int,
+    ) -> LinePrefixes:
+        return prefixes[:-1]
+
+    def __repr__(self):
+        return '<PopLinePrefix>'
+
+
+def prefixed_indentation(
+        indentation: str,
+        indents: int,
+        prefixes: LinePrefixes,
+) -> str:
+    """
+    Builds the whitespace and prefixes placed at the start of a line.
+
+    :param indentation: String used for indents.
+    :param indents: Number of indents.
+    :param prefixes: Line prefixes, each paired with the depth at which
+                     it was added.
+    :return: Indentation string with prefixes inserted.
+    """
+    parts = []
+    previous_depth = 0
+    for depth, prefix in prefixes:
+        parts.append(indentation * (depth - previous_depth))
+        parts.append(prefix)
+        previous_depth = max(depth, previous_depth)
+    parts.append(indentation * (indents - previous_depth))
+    return ''.join(parts)
@@ -1,6 +1,21 @@
-class Newline:
+import functools
+
+from .immutable import ImmutableNode
+
+
+class Newline(ImmutableNode):
     """
     Nodes that represent the end of a line.
     """
+    __slots__ = ()
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def of(cls) -> 'Newline':
+        """
+        :return: Shared instance.
+        """
+        return cls()
+
     def __repr__(self):
         return '<Newline>'
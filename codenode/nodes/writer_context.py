@@ -0,0 +1,39 @@
+import typing
+
+if typing.TYPE_CHECKING:
+    from typing import Callable
+    from ..writer import Writer, NodeType
+
+
+class WriterContextNode:
+    """
+    Nodes whose content depends on the writer processing them,
+    i.e. its type and current settings.
+    """
+    def node_for(self, writer: 'Writer') -> 'NodeType':
+        """
+        Method used to get the node processed in place of this one.
+
+        :param writer: Writer processing this node.
+        :return: Node to process.
+        """
+        raise NotImplementedError
+
+
+class WriterCallback(WriterContextNode):
+    """
+    Nodes that call a function with the writer processing them, then
+    process the result in their place.
+    """
+    def __init__(self, function: 'Callable[[Writer], NodeType]'):
+        """
+        :param function: Function that takes a writer and returns a node.
+        """
+        self.function = function
+        "Function called with the writer when this node is processed."
+
+    def node_for(self, writer: 'Writer') -> 'NodeType':
+        return self.function(writer)
+
+    def __repr__(self):
+        return f'<WriterCallback {self.function!r}>'
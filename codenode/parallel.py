@@ -0,0 +1,221 @@
+import concurrent.futures
+import os
+import pickle
+import sys
+import sysconfig
+import time
+import traceback
+import typing
+
+from .writer import Writer
+from .debug import debug_writer_type
+from .file_sink import ChangedFileSink
+
+if typing.TYPE_CHECKING:
+    from typing import Callable, Mapping, Optional, Type, Union
+    from .writer import NodeType
+    PathType = Union[str, os.PathLike]
+
+
+class DumpManyError(Exception):
+    """
+    Raised by dump_many when one or more node trees could not be dumped.
+    """
+    def __init__(self, errors: 'dict[PathType, str]'):
+        """
+        :param errors: Formatted tracebacks keyed by path, in the same
+                       order as the paths were given to dump_many.
+        """
+        self.errors = errors
+        """
+        Formatted tracebacks keyed by path, in the same order as the
+        paths were given to dump_many.
+        """
+        super().__init__(
+            f'Failed to dump {len(errors)} file(s):\n\n' +
+            '\n'.join(
+                f'{os.fspath(path)}:\n{error}'
+                for path, error in errors.items()
+            )
+        )
+
+
+def is_free_threaded() -> bool:
+    """
+    :return: True if running on a free-threaded build of python with the
+             GIL disabled.
+    """
+    if not sysconfig.get_config_var('Py_GIL_DISABLED'):
+        return False
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def is_picklable(obj) -> bool:
+    """
+    :param obj: Any object.
+    :return: True if the object can be sent to a worker process.
+    """
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    else:
+        return True
+
+
+def dump_file(
+        path: 'PathType',
+        node: 'Union[NodeType, Callable[[], NodeType]]',
+        writer_type: 'Type[Writer]',
+        options: dict,
+) -> 'tuple[float, Optional[str]]':
+    """
+    Dump a single node tree to a file. Used by dump_many in each worker.
+    Partially written files are removed if an error occurs.
+
+    :param path: Path of file to write to.
+    :param node: Base node of node tree, or a callable with no arguments
+                 that returns one.
+    :param writer_type: Writer type used to dump the node tree.
+    :param options: Keyword arguments for the writer and open.
+    :return: Tuple containing the time taken in seconds and either None
+             or a formatted traceback if an error occurred.
+    """
+    start = time.perf_counter()
+    try:
+        writer_type = debug_writer_type(writer_type, options['debug'])
+
+        if callable(node):
+            node = node()
+
+        writer = writer_type(
+            node,
+            indentation=options['indentation'],
+            newline=options['newline'],
+            depth=options['depth'],
+        )
+
+        if options['if_changed']:
+            with ChangedFileSink(path, encoding=options['encoding']) as sink:
+                writer.dump(sink, buffer_size=65536)
+        else:
+            with open(
+                    path, 'w',
+                    encoding=options['encoding'],
+                    newline='',
+            ) as file:
+                try:
+                    writer.dump(file)
+                except BaseException:
+                    file.close()
+                    os.remove(path)
+                    raise
+
+    except Exception as error:
+        return time.perf_counter() - start, ''.join(
+            traceback.format_exception(
+                type(error), error, error.__traceback__,
+            )
+        )
+
+    return time.perf_counter() - start, None
+
+
+def dump_many(
+        nodes: 'Mapping[PathType, Union[NodeType, Callable[[], NodeType]]]',
+        *,
+        workers: 'Optional[int]' = None,
+        executor='auto',
+        writer_type: 'Optional[Type[Writer]]' = None,
+        encoding='utf-8',
+        indentation='    ',
+        newline='\n',
+        depth=0,
+        debug=False,
+        if_changed=False,
+) -> 'dict[PathType, float]':
+    """
+    Process and write out many independent node trees to files in
+    parallel.
+
+    Node trees are sent to worker processes, so they need to be
+    picklable. Generators are not, so pass a callable with no
+    arguments that builds the node tree instead (i.e. a module level
+    function, or a functools.partial of one). Each callable is called
+    inside the worker that dumps its output.
+
+    Errors do not stop other files from being dumped. Once every file has
+    been processed, a DumpManyError is raised listing each failure in
+    the order the paths were given.
+
+    :param nodes: Mapping of file paths to either base nodes of node
+                  trees or callables that return them.
+    :param workers: Maximum number of workers. Defaults to the number of
+                    processors on the machine.
+    :param executor: 'process' to use worker processes, 'thread' to use
+                     threads, or 'auto' to use processes unless running
+                     on a free-threaded build, falling back to threads if
+                     anything can't be pickled.
+    :param writer_type: Writer type used to dump each node tree.
+                        Defaults to codenode.default_writer_type.
+    :param encoding: Encoding used for the output files.
+    :param indentation: String used for indents in the output.
+    :param newline: String used for newlines in the output.
+    :param depth: Base depth (i.e. number of indents) to start at.
+    :param debug: If True, errors will include extra info to give a
+                  better idea of which node caused them. If 'lazy', the
+                  same info is worked out after an error occurs instead,
+                  with almost no overhead.
+    :param if_changed: If True, files are only written if their output
+                       differs from their existing contents, as with
+                       dump_if_changed.
+    :return: Time taken in seconds to dump each file, keyed by path.
+    """
+    if writer_type is None:
+        from . import default_writer_type as writer_type
+
+    options = {
+        'encoding': encoding,
+        'indentation': indentation,
+        'newline': newline,
+        'depth': depth,
+        'debug': debug,
+        'if_changed': if_changed,
+    }
+
+    if executor == 'auto':
+        if is_free_threaded() or not is_picklable(
+                (writer_type, tuple(nodes.items()))
+        ):
+            executor = 'thread'
+        else:
+            executor = 'process'
+
+    if executor == 'process':
+        executor_type = concurrent.futures.ProcessPoolExecutor
+    elif executor == 'thread':
+        executor_type = concurrent.futures.ThreadPoolExecutor
+    else:
+        raise ValueError(
+            f'Unknown executor "{executor}". '
+            'Expected "process", "thread" or "auto".'
+        )
+
+    with executor_type(max_workers=workers) as pool:
+        futures = {
+            path: pool.submit(dump_file, path, node, writer_type, options)
+            for path, node in nodes.items()
+        }
+
+        timings = {}
+        errors = {}
+        for path, future in futures.items():
+            timings[path], error = future.result()
+            if error is not None:
+                errors[path] = error
+
+    if errors:
+        raise DumpManyError(errors)
+
+    return timings
@@ -0,0 +1,293 @@
+import time
+import typing
+
+from .writer import Writer
+from .nodes.newline import Newline
+from .nodes.indentation import Indentation
+from .nodes.frozen import FrozenNode
+
+if typing.TYPE_CHECKING:
+    from typing import Optional
+
+StackPath = typing.Tuple[str, ...]
+
+
+class ProfileEntry:
+    """
+    Totals recorded for a group of nodes while profiling.
+    """
+    def __init__(self):
+        self.time = 0.0
+        """
+        Seconds spent processing, excluding time spent on child nodes
+        unless the entry is a total for a whole subtree.
+        """
+        self.chunks = 0
+        "Number of string chunks output."
+        self.characters = 0
+        "Number of characters output."
+        self.count = 0
+        "Number of nodes processed."
+
+    def add(self, other: 'ProfileEntry'):
+        """
+        Add the totals of another entry to this one.
+
+        :param other: Entry to add.
+        """
+        self.time += other.time
+        self.chunks += other.chunks
+        self.characters += other.characters
+        self.count += other.count
+
+    def __repr__(self):
+        return (
+            f'<ProfileEntry time={self.time:.6f}s chunks={self.chunks} '
+            f'characters={self.characters} count={self.count}>'
+        )
+
+
+class RenderProfile:
+    """
+    Collects timings and output counts while a node tree is processed.
+
+    Pass an instance as the profile parameter of codenode.dump/dumps,
+    or create a profiling writer type using profile_patch.
+
+    Entries are recorded per stack path, i.e. the names of the types of
+    each iterable node from the base of the tree down to the node
+    being processed.
+    """
+    def __init__(self):
+        self.stacks: 'dict[StackPath, ProfileEntry]' = {}
+        """
+        Entries keyed by stack path. Times exclude child nodes.
+        """
+        self.max_depth = 0
+        "Largest number of iterators in the writer's stack at once."
+        self.paused = 0
+        """
+        Above 0 while the writer renders part of the node tree separately,
+        i.e. for a sub writer or the subtree cache, so that output isn't
+        recorded twice.
+        """
+
+    def entry(self, path: StackPath) -> ProfileEntry:
+        """
+        :param path: Stack path.
+        :return: Entry for the given path, created if necessary.
+        """
+        try:
+            return self.stacks[path]
+        except KeyError:
+            entry = self.stacks[path] = ProfileEntry()
+            return entry
+
+    def by_type(self) -> 'dict[str, ProfileEntry]':
+        """
+        :return: Totals grouped by the type of the node that was being
+                 processed, excluding time spent on child nodes.
+        """
+        result = {}
+        for path, entry in self.stacks.items():
+            if path:
+                result.setdefault(path[-1], ProfileEntry()).add(entry)
+        return result
+
+    def by_subtree(self, level=1) -> 'dict[StackPath, ProfileEntry]':
+        """
+        :param level: Depth of the subtrees to group by. 1 groups by the
+                      base node, 2 groups by each type of node directly
+                      inside the base node, and so on.
+        :return: Totals grouped by the stack path of the subtree they
+                 occurred in, including time spent on child nodes.
+        """
+        result = {}
+        for path, entry in self.stacks.items():
+            if len(path) >= level:
+                result.setdefault(path[:level], ProfileEntry()).add(entry)
+        return result
+
+    def collapsed_stacks(self, unit=1e-6) -> str:
+        """
+        Export times in the collapsed stack format used by flamegraph
+        tools, i.e. one line per stack path with type names separated by
+        semicolons followed by a count.
+
+        :param unit: Number of seconds represented by each count.
+                     Microseconds by default.
+        :return: Collapsed stack text.
+        """
+        return ''.join(
+            f'{";".join(path)} {round(entry.time / unit)}\n'
+            for path, entry in self.stacks.items()
+            if path
+        )
+
+    def write_collapsed_stacks(self, path, unit=1e-6):
+        """
+        Write collapsed stack text to a file.
+
+        :param path: Path of file to write to.
+        :param unit: Number of seconds represented by each count.
+                     Microseconds by default.
+        """
+        with open(path, 'w') as file:
+            file.write(self.collapsed_stacks(unit))
+
+
+class ProfilingIterator:
+    """
+    Wraps an iterator in a writer's stack to record profiling info
+    about the node it iterates over.
+    """
+    __slots__ = (
+        'iterator', 'writer', 'entry', 'path', 'parent', 'start',
+        'child_time', 'active',
+    )
+
+    def __init__(
+            self,
+            iterator,
+            writer: Writer,
+            profile: RenderProfile,
+            path: StackPath,
+            active: 'list[ProfilingIterator]',
+    ):
+        self.iterator = iterator
+        self.writer = writer
+        self.entry = profile.entry(path)
+        self.entry.count += 1
+        self.path = path
+        self.parent = active[-1] if active else None
+        self.start = time.perf_counter()
+        self.child_time = 0.0
+        self.active = active
+        active.append(self)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            item = next(self.iterator)
+        except StopIteration:
+            elapsed = time.perf_counter() - self.start
+            self.entry.time += elapsed - self.child_time
+            if self.parent is not None:
+                self.parent.child_time += elapsed
+            self.active.pop()
+            raise
+
+        entry = self.entry
+        writer = self.writer
+        if isinstance(item, str):
+            entry.chunks += 1
+            entry.characters += len(item)
+        elif isinstance(item, Indentation):
+            entry.chunks += 1
+            entry.characters += len(
+                writer.get_indentation(item.indents_for(writer.depth))
+            )
+        elif isinstance(item, Newline):
+            entry.chunks += 1
+            entry.characters += len(writer.newline)
+        elif isinstance(item, FrozenNode):
+            text, _, _ = item.render(
+                writer.indentation, writer.newline, writer.depth,
+                writer.line_prefixes,
+            )
+            entry.chunks += 1
+            entry.characters += len(text)
+
+        return item
+
+    def __repr__(self):
+        return f'<ProfilingIterator {";".join(self.path)}>'
+
+
+def profile_patch(
+        writer_type: typing.Type[Writer],
+        profile: RenderProfile,
+) -> typing.Type[Writer]:
+    """
+    Creates a modified version of a writer type which records time spent,
+    chunks output, characters output and maximum stack depth into a
+    profile while processing. Used in codenode.dump/dumps to implement
+    the profile parameter.
+
+    Times are wall clock times, so they include time spent by whatever
+    consumes the output, i.e. writing to a stream.
+
+    Can be combined with other patches which wrap the iterators in the
+    writer's stack, such as source_map_patch, since the iterators
+    recording into the profile are tracked separately.
+
+    :param writer_type: Base writer type.
+    :param profile: Profile to record into.
+    :return: New child writer type with profiling modifications.
+    """
+    class PatchedWriter(writer_type):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.profiling_iterators: 'Optional[list]' = None
+            """
+            Profiling iterators currently in the stack, innermost last,
+            or None if this writer doesn't record into the profile.
+            """
+            if profile.paused:
+                # rendering part of the tree separately for another
+                # patched writer, which records the output itself.
+                return
+
+            active = self.profiling_iterators = []
+            stack = self.stack
+            items = stack.items
+            push = stack.push
+            items[-1] = ProfilingIterator(items[-1], self, profile, (), active)
+
+            def profiling_push(node):
+                name = type(node).__qualname__
+                path = active[-1].path + (name,) if active else (name,)
+
+                push(node)
+                items[-1] = ProfilingIterator(
+                    items[-1], self, profile, path, active,
+                )
+                if len(items) > profile.max_depth:
+                    profile.max_depth = len(items)
+
+            stack.push = profiling_push
+
+        def render_cached(self, node):
+            start = time.perf_counter()
+            profile.paused += 1
+            try:
+                text = super().render_cached(node)
+            finally:
+                profile.paused -= 1
+
+            active = self.profiling_iterators
+            if text is not None and active is not None:
+                elapsed = time.perf_counter() - start
+                name = type(node).__qualname__
+                parent = active[-1] if active else None
+                entry = profile.entry(
+                    parent.path + (name,) if parent else (name,)
+                )
+                entry.time += elapsed
+                entry.count += 1
+                entry.chunks += 1
+                entry.characters += len(text)
+                if parent is not None:
+                    parent.child_time += elapsed
+            return text
+
+        def sub_writer(self, *args, **kwargs):
+            profile.paused += 1
+            try:
+                return super().sub_writer(*args, **kwargs)
+            finally:
+                profile.paused -= 1
+
+    return PatchedWriter
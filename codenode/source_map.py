@@ -0,0 +1,381 @@
+import array
+import bisect
+import json
+import typing
+
+from .writer import Writer
+from .nodes.newline import Newline
+from .nodes.indentation import Indentation
+from .nodes.frozen import FrozenNode
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Optional
+
+
+class SourceMap:
+    """
+    Records which node produced each part of the output of a node tree.
+
+    Pass an instance as the source_map parameter of codenode.dump/dumps,
+    or create a recording writer type using source_map_patch.
+
+    Each iterable node processed is given an id, along with the id of the
+    node it was found in. Output is stored as runs, i.e. the offset at
+    which each run of output from the same node starts along with that
+    node's id, in arrays rather than as an object per chunk. The offset
+    each line starts at is recorded too, for looking up positions by
+    line and column.
+
+    Offsets and columns are numbers of characters.
+    """
+    def __init__(self, keep_nodes=False):
+        """
+        :param keep_nodes: If True, references to the nodes themselves are
+                           kept alongside their descriptions, so they can
+                           be inspected after the output is produced.
+                           This keeps the whole node tree in memory.
+        """
+        self.run_starts = array.array('Q')
+        "Offset at which each run of output starts."
+        self.run_ids = array.array('l')
+        "Id of the node that produced each run of output."
+        self.parents = array.array('l')
+        "Id of the parent of each node, or -1 for base nodes."
+        self.descriptions: 'list[str]' = []
+        "Description of each node, by default the name of its type."
+        self.nodes: 'Optional[list]' = [] if keep_nodes else None
+        "Each node, if keep_nodes was True."
+        self.line_starts = array.array('Q', (0,))
+        "Offset at which each line starts."
+        self.length = 0
+        "Total number of characters in the output."
+        self.paused = 0
+        """
+        Above 0 while the writer renders part of the node tree separately,
+        i.e. for the subtree cache, so that output isn't recorded twice.
+        """
+
+    def describe(self, node) -> str:
+        """
+        Method used to get the description stored for each node.
+        Can be overridden, i.e. to include the name of a function node.
+
+        :param node: Node being recorded.
+        :return: Description of node.
+        """
+        return type(node).__qualname__
+
+    def add_node(self, node, parent: int) -> int:
+        """
+        Give a node an id.
+
+        :param node: Node being recorded.
+        :param parent: Id of node's parent, or -1 if it is a base node.
+        :return: Id of node.
+        """
+        self.parents.append(parent)
+        self.descriptions.append(self.describe(node))
+        if self.nodes is not None:
+            self.nodes.append(node)
+        return len(self.parents) - 1
+
+    def record(self, node_id: int, text: str):
+        """
+        Record a chunk of output.
+
+        :param node_id: Id of node that produced the output.
+        :param text: Output.
+        """
+        if not text:
+            return
+
+        start = self.length
+        run_ids = self.run_ids
+        if not run_ids or run_ids[-1] != node_id:
+            self.run_starts.append(start)
+            run_ids.append(node_id)
+
+        index = text.find('\n')
+        if index != -1:
+            append_line = self.line_starts.append
+            while index != -1:
+                append_line(start + index + 1)
+                index = text.find('\n', index + 1)
+
+        self.length = start + len(text)
+
+    def lookup(self, offset: int) -> 'Optional[int]':
+        """
+        :param offset: Offset in the output.
+        :return: Id of the node that produced the character at the offset,
+                 or None if the offset is outside the output.
+        """
+        if not 0 <= offset < self.length:
+            return None
+        return self.run_ids[bisect.bisect_right(self.run_starts, offset) - 1]
+
+    def offset_for(self, line: int, column: int) -> int:
+        """
+        :param line: Index of a line in the output.
+        :param column: Index of a character in the line.
+        :return: Offset in the output.
+        """
+        return self.line_starts[line] + column
+
+    def position_for(self, offset: int) -> 'tuple[int, int]':
+        """
+        :param offset: Offset in the output.
+        :return: Tuple containing the line and column of the offset.
+        """
+        line = bisect.bisect_right(self.line_starts, offset) - 1
+        return line, offset - self.line_starts[line]
+
+    def lookup_position(self, line: int, column: int) -> 'Optional[int]':
+        """
+        :param line: Index of a line in the output.
+        :param column: Index of a character in the line.
+        :return: Id of the node that produced the character at the
+                 position, or None if it is outside the output.
+        """
+        if not 0 <= line < len(self.line_starts):
+            return None
+        return self.lookup(self.offset_for(line, column))
+
+    def path(self, node_id: int) -> 'list[int]':
+        """
+        :param node_id: Id of a node.
+        :return: Ids of each node from the base node down to the given
+                 node.
+        """
+        path = []
+        while node_id != -1:
+            path.append(node_id)
+            node_id = self.parents[node_id]
+        path.reverse()
+        return path
+
+    def stack_path(self, node_id: int) -> 'list[str]':
+        """
+        :param node_id: Id of a node.
+        :return: Descriptions of each node from the base node down to the
+                 given node.
+        """
+        return [self.descriptions[i] for i in self.path(node_id)]
+
+    def node(self, node_id: int) -> 'Any':
+        """
+        :param node_id: Id of a node.
+        :return: The node, if keep_nodes was True, otherwise its
+                 description.
+        """
+        if self.nodes is None:
+            return self.descriptions[node_id]
+        return self.nodes[node_id]
+
+    def to_dict(self) -> dict:
+        """
+        :return: Contents of this source map as a JSON serializable dict.
+                 Node references are not included.
+        """
+        return {
+            'version': 1,
+            'length': self.length,
+            'runs': [*self.run_starts],
+            'run_ids': [*self.run_ids],
+            'parents': [*self.parents],
+            'descriptions': self.descriptions,
+            'lines': [*self.line_starts],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SourceMap':
+        """
+        :param data: Dict returned by to_dict.
+        :return: New source map, without node references.
+        """
+        if data.get('version') != 1:
+            raise ValueError(
+                f'Unsupported source map version {data.get("version")!r}.'
+            )
+        source_map = cls()
+        source_map.length = data['length']
+        source_map.run_starts = array.array('Q', data['runs'])
+        source_map.run_ids = array.array('l', data['run_ids'])
+        source_map.parents = array.array('l', data['parents'])
+        source_map.descriptions = list(data['descriptions'])
+        source_map.line_starts = array.array('Q', data['lines'])
+        return source_map
+
+    def write(self, path):
+        """
+        Write this source map to a JSON file, i.e. a sidecar file next to
+        the output.
+
+        :param path: Path of file to write to.
+        """
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, separators=(',', ':'))
+
+    @classmethod
+    def read(cls, path) -> 'SourceMap':
+        """
+        Read a source map from a JSON file written by write.
+
+        :param path: Path of file to read from.
+        :return: New source map, without node references.
+        """
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
+
+    def __len__(self):
+        return len(self.run_starts)
+
+    def __repr__(self):
+        return (
+            f'<SourceMap ({len(self.descriptions)} nodes, '
+            f'{len(self.run_starts)} runs)>'
+        )
+
+
+class SourceMapIterator:
+    """
+    Wraps an iterator in a writer's stack to record the output produced
+    by the node it iterates over.
+    """
+    __slots__ = (
+        'iterator', 'writer', 'source_map', 'record', 'id', 'active',
+    )
+
+    def __init__(
+            self,
+            iterator,
+            writer: Writer,
+            source_map: SourceMap,
+            node_id: int,
+            active: 'list[SourceMapIterator]',
+    ):
+        self.iterator = iterator
+        self.writer = writer
+        self.source_map = source_map
+        self.record = source_map.record
+        self.id = node_id
+        self.active = active
+        active.append(self)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            item = next(self.iterator)
+        except StopIteration:
+            self.active.pop()
+            raise
+
+        if isinstance(item, str):
+            self.record(self.id, item)
+        elif isinstance(item, Indentation):
+            writer = self.writer
+            self.record(
+                self.id,
+                writer.get_indentation(item.indents_for(writer.depth)),
+            )
+        elif isinstance(item, Newline):
+            self.record(self.id, self.writer.newline)
+        elif isinstance(item, FrozenNode):
+            writer = self.writer
+            source_map = self.source_map
+            text, _, _ = item.render(
+                writer.indentation, writer.newline, writer.depth,
+                writer.line_prefixes,
+            )
+            source_map.record(source_map.add_node(item, self.id), text)
+
+        return item
+
+    def __repr__(self):
+        return f'<SourceMapIterator {self.id}>'
+
+
+def source_map_patch(
+        writer_type: typing.Type[Writer],
+        source_map: SourceMap,
+) -> typing.Type[Writer]:
+    """
+    Creates a modified version of a writer type which records which node
+    produced each part of the output into a source map. Used in
+    codenode.dump/dumps to implement the source_map parameter.
+
+    Can be combined with other patches which wrap the iterators in the
+    writer's stack, such as profile_patch, since the iterators recording
+    into the source map are tracked separately.
+
+    :param writer_type: Base writer type.
+    :param source_map: Source map to record into.
+    :return: New child writer type with source map modifications.
+    """
+    class PatchedWriter(writer_type):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.source_map_iterators: 'Optional[list]' = None
+            """
+            Recording iterators currently in the stack, innermost last,
+            or None if this writer doesn't record into the source map.
+            """
+            if source_map.paused:
+                # rendering part of the tree separately for another
+                # patched writer, which records the output itself.
+                return
+
+            active = self.source_map_iterators = []
+            stack = self.stack
+            items = stack.items
+            push = stack.push
+            root = items[-1] = SourceMapIterator(
+                items[-1], self, source_map,
+                source_map.add_node(self.node, -1), active,
+            )
+
+            def recording_push(node):
+                parent = active[-1] if active else None
+                if parent is root and node is self.node:
+                    # the base node shares the id of the iterator it
+                    # was placed in by the writer.
+                    node_id = root.id
+                elif parent is not None:
+                    node_id = source_map.add_node(node, parent.id)
+                else:
+                    node_id = source_map.add_node(node, -1)
+
+                push(node)
+                items[-1] = SourceMapIterator(
+                    items[-1], self, source_map, node_id, active,
+                )
+
+            stack.push = recording_push
+
+        def render_cached(self, node):
+            source_map.paused += 1
+            try:
+                text = super().render_cached(node)
+            finally:
+                source_map.paused -= 1
+
+            active = self.source_map_iterators
+            if text is not None and active is not None:
+                source_map.record(
+                    source_map.add_node(
+                        node, active[-1].id if active else -1,
+                    ),
+                    text,
+                )
+            return text
+
+        def sub_writer(self, *args, **kwargs):
+            source_map.paused += 1
+            try:
+                return super().sub_writer(*args, **kwargs)
+            finally:
+                source_map.paused -= 1
+
+    return PatchedWriter
@@ -0,0 +1,84 @@
+import collections
+import typing
+
+if typing.TYPE_CHECKING:
+    from typing import Hashable, Optional
+    from .nodes.line_prefix import LinePrefixes
+    Entry = typing.Tuple[str, int, LinePrefixes]
+
+
+class SubtreeCache:
+    """
+    Stores the output of cacheable nodes so that unchanged subtrees can be
+    output again without being processed, i.e. between repeated dumps of
+    a node tree where only some parts change.
+
+    Output is stored per cache key, indentation, newline, depth and line
+    prefixes. The least recently used entries are removed once the cache
+    is full.
+    """
+    def __init__(self, max_size=1024):
+        """
+        :param max_size: Maximum number of entries to keep.
+        """
+        self.max_size = max_size
+        "Maximum number of entries to keep."
+        self.entries: 'collections.OrderedDict[Hashable, Entry]' = \
+            collections.OrderedDict()
+        """
+        Output, depth after processing and line prefixes after processing,
+        keyed by node cache key and writer settings, in order of use.
+        """
+        self.hits = 0
+        "Number of times stored output was reused."
+        self.misses = 0
+        "Number of times output had to be rendered."
+        self.evictions = 0
+        "Number of entries removed to make space for new ones."
+
+    def get(self, key: 'Hashable') -> 'Optional[Entry]':
+        """
+        :param key: Entry key.
+        :return: Stored entry, or None if there isn't one.
+        """
+        try:
+            entry = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: 'Hashable', entry: 'Entry'):
+        """
+        Store an entry, removing the least recently used entries if the
+        cache is full.
+
+        :param key: Entry key.
+        :param entry: Output, depth after processing and line prefixes
+                      after processing.
+        """
+        entries = self.entries
+        entries[key] = entry
+        entries.move_to_end(key)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all entries and reset statistics.
+        """
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return (
+            f'<SubtreeCache {len(self.entries)}/{self.max_size} entries '
+            f'hits={self.hits} misses={self.misses} '
+            f'evictions={self.evictions}>'
+        )
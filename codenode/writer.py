@@ -1,16 +1,55 @@
+import codecs
 import collections
+import hashlib
 import io
+import mmap
+import os
 import typing
 
 from .nodes.newline import Newline
 from .nodes.indentation import Indentation
 from .nodes.depth_change import DepthChange
+from .nodes.frozen import FrozenNode
+from .nodes.line_prefix import LinePrefixChange, prefixed_indentation
+from .nodes.writer_context import WriterContextNode
+from .nodes.buffer import NodeBuffer
+from .nodes.joined import Joined
+from .nodes.cacheable import CacheableNode
+from .file_sink import open_temp_file, replace_file
 
 if typing.TYPE_CHECKING:
-    from typing import Union, Iterable
+    from typing import Union, Iterable, Optional
+    from .nodes.line_prefix import LinePrefixes
+    from .subtree_cache import SubtreeCache
     NodeType = Iterable[Union[str, 'NodeType']]
 
 
+def coalesce(
+        chunks: 'Iterable[str]',
+        buffer_size: int,
+) -> 'Iterable[str]':
+    """
+    Joins string chunks together into larger chunks.
+
+    :param chunks: Iterable of string chunks.
+    :param buffer_size: Minimum number of characters in each chunk
+                        yielded, aside from the last one.
+    :return: Iterable of joined string chunks.
+    """
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            yield ''.join(buffer)
+            buffer.clear()
+            size = 0
+
+    if size:
+        yield ''.join(buffer)
+
+
 class WriterStack:
     """
     A stack of iterators.
@@ -74,12 +113,136 @@ class Writer:
         "WriterStack used to iterate over the node tree"
         self.stack.push((node,))
 
+        self.indentation_cache: 'dict[int, str]' = {}
+        """
+        Indentation strings keyed by number of indents. Replaced with an
+        empty dict whenever indentation or line_prefixes are set.
+        """
+        self.line_prefixes: 'LinePrefixes' = ()
+        """
+        Current strings placed at the start of lines, each paired with
+        the depth at which it was added.
+        """
         self.indentation = indentation
         "Current string used for indents in the output"
         self.newline = newline
         "Current string used for line termination in the output"
         self.depth = depth
         "Current output depth (i.e. number of indents)"
+        self.subtree_cache: 'Optional[SubtreeCache]' = None
+        """
+        If set, output of cacheable nodes is stored in and reused
+        from this cache.
+        """
+
+    @property
+    def indentation(self) -> str:
+        return self._indentation
+
+    @indentation.setter
+    def indentation(self, indentation: str):
+        self._indentation = indentation
+        self.indentation_cache = {}
+
+    @property
+    def line_prefixes(self) -> 'LinePrefixes':
+        return self._line_prefixes
+
+    @line_prefixes.setter
+    def line_prefixes(self, line_prefixes: 'LinePrefixes'):
+        self._line_prefixes = line_prefixes
+        self.indentation_cache = {}
+
+    def get_indentation(self, indents: int) -> str:
+        """
+        Get the indentation string for a number of indents, including any
+        line prefixes, building and caching it on first use.
+
+        :param indents: Number of indents.
+        :return: Indentation string.
+        """
+        try:
+            return self.indentation_cache[indents]
+        except KeyError:
+            if self.line_prefixes:
+                string = prefixed_indentation(
+                    self.indentation, indents, self.line_prefixes,
+                )
+            else:
+                string = self.indentation * indents
+            self.indentation_cache[indents] = string
+            return string
+
+    def sub_writer(
+            self,
+            node: 'NodeType', *,
+            indentation: 'Optional[str]' = None,
+            newline: 'Optional[str]' = None,
+    ) -> 'Writer':
+        """
+        Create a writer of the same type and with the same settings as
+        this one, used to render part of a node tree separately, i.e. to
+        transform its output. Any modifications to this writer's type,
+        such as debug patches, also apply to the new writer.
+
+        The new writer starts at depth 0 with no line prefixes, and shares
+        this writer's indentation cache where possible.
+
+        :param node: Base node of node tree.
+        :param indentation: If given, used for indents instead of this
+                            writer's indentation string.
+        :param newline: If given, used for newlines instead of this
+                        writer's newline string.
+        :return: New writer.
+        """
+        writer = type(self)(
+            node,
+            indentation=self.indentation if indentation is None
+            else indentation,
+            newline=self.newline if newline is None else newline,
+        )
+        if writer.indentation == self.indentation and not self.line_prefixes:
+            writer.indentation_cache = self.indentation_cache
+        return writer
+
+    def render_cached(self, node: CacheableNode) -> 'Optional[str]':
+        """
+        Get the output of a cacheable node from the subtree cache,
+        rendering and storing it first if necessary, and apply the changes
+        to depth and line prefixes it makes. Nodes without a cache key are
+        pushed onto the stack instead.
+
+        :param node: Cacheable node.
+        :return: Output of the node, or None if it was pushed onto
+                 the stack.
+        """
+        key = node.cache_key()
+        if key is None:
+            self.stack.push(node)
+            return None
+
+        cache = self.subtree_cache
+        key = key, self.indentation, self.newline, self.depth, \
+            self.line_prefixes
+        entry = cache.get(key)
+        if entry is None:
+            # the node's contents are processed rather than the node
+            # itself so that it isn't looked up in the cache again.
+            writer = type(self)(
+                iter(node),
+                indentation=self.indentation,
+                newline=self.newline,
+                depth=self.depth,
+            )
+            writer.line_prefixes = self.line_prefixes
+            writer.subtree_cache = cache
+            entry = writer.dumps(), writer.depth, writer.line_prefixes
+            cache.put(key, entry)
+
+        text, self.depth, line_prefixes = entry
+        if line_prefixes != self.line_prefixes:
+            self.line_prefixes = line_prefixes
+        return text
 
     def process_node(self, node) -> 'Iterable[str]':
         """
@@ -102,9 +265,34 @@ class Writer:
         elif isinstance(node, DepthChange):
             self.depth = node.new_depth_for(self.depth)
         elif isinstance(node, Indentation):
-            yield self.indentation * node.indents_for(self.depth)
+            yield self.get_indentation(node.indents_for(self.depth))
         elif isinstance(node, Newline):
             yield self.newline
+        elif isinstance(node, FrozenNode):
+            text, self.depth, line_prefixes = node.render(
+                self.indentation, self.newline, self.depth,
+                self.line_prefixes,
+            )
+            if line_prefixes != self.line_prefixes:
+                self.line_prefixes = line_prefixes
+            yield text
+        elif isinstance(node, LinePrefixChange):
+            self.line_prefixes = node.new_prefixes_for(
+                self.line_prefixes, self.depth,
+            )
+        elif isinstance(node, WriterContextNode):
+            self.stack.push((node.node_for(self),))
+        elif isinstance(node, NodeBuffer):
+            self.stack.push(node.chunks_for(self))
+        elif isinstance(node, Joined):
+            self.stack.push(node.parts())
+        elif (
+                isinstance(node, CacheableNode) and
+                self.subtree_cache is not None
+        ):
+            text = self.render_cached(node)
+            if text is not None:
+                yield text
         else:
             try:
                 self.stack.push(node)
@@ -126,14 +314,284 @@ class Writer:
         for node in self.stack:
             yield from self.process_node(node)
 
-    def dump(self, stream):
+    def coalesced_dump_iter(self, buffer_size: int) -> 'Iterable[str]':
+        """
+        Process and write out a node tree as an iterable of string chunks,
+        joining small chunks together into larger ones.
+
+        :param buffer_size: Minimum number of characters in each chunk,
+                            aside from the last one.
+        :return: Iterable of string chunks.
+        """
+        return coalesce(self.dump_iter(), buffer_size)
+
+    def dump(self, stream, *, buffer_size=0, flush=False):
         """
         Process and write out a node tree to a stream.
 
         :param stream: An object with a 'write' method.
+        :param buffer_size: If above 0, chunks are joined together until
+                            they contain at least this many characters
+                            before being written, reducing the number of
+                            calls to the stream's write method.
+        :param flush: If True, the stream's flush method is called after
+                      each write.
+        """
+        if buffer_size > 0:
+            chunks = self.coalesced_dump_iter(buffer_size)
+        else:
+            chunks = self.dump_iter()
+
+        write = stream.write
+        if flush:
+            for chunk in chunks:
+                write(chunk)
+                stream.flush()
+        else:
+            for chunk in chunks:
+                write(chunk)
+
+    def encoded_dump_iter(
+            self, *,
+            encoding='utf-8',
+            errors='strict',
+            buffer_size=65536,
+    ) -> 'Iterable[bytes]':
+        """
+        Process and write out a node tree as an iterable of encoded
+        chunks. String chunks are joined together then encoded
+        incrementally as they are produced.
+
+        :param encoding: Encoding used for the output.
+        :param errors: Error handling scheme used when encoding,
+                       i.e. 'strict', 'replace' or 'ignore'.
+        :param buffer_size: Chunks are joined together until they contain
+                            at least this many characters before being
+                            encoded.
+        :return: Iterable of bytes.
+        """
+        encode = codecs.getincrementalencoder(encoding)(errors).encode
+        for chunk in coalesce(self.dump_iter(), buffer_size):
+            yield encode(chunk)
+
+        tail = encode('', True)
+        if tail:
+            yield tail
+
+    def dump_bytes(
+            self, stream, *,
+            encoding='utf-8',
+            errors='strict',
+            buffer_size=65536,
+    ):
+        """
+        Process and write out a node tree to a binary stream.
+
+        :param stream: An object with a 'write' method that accepts bytes.
+        :param encoding: Encoding used for the output.
+        :param errors: Error handling scheme used when encoding,
+                       i.e. 'strict', 'replace' or 'ignore'.
+        :param buffer_size: Chunks are joined together until they contain
+                            at least this many characters before being
+                            encoded and written.
+        """
+        write = stream.write
+        for chunk in self.encoded_dump_iter(
+                encoding=encoding,
+                errors=errors,
+                buffer_size=buffer_size,
+        ):
+            write(chunk)
+
+    def dumpb(
+            self, *,
+            encoding='utf-8',
+            errors='strict',
+            buffer: 'Optional[bytearray]' = None,
+            size: 'Optional[int]' = None,
+    ) -> bytearray:
+        """
+        Process and write out a node tree as encoded bytes.
+        Chunks are encoded straight into a single buffer, so the output
+        is never held as a string.
+
+        :param encoding: Encoding used for the output.
+        :param errors: Error handling scheme used when encoding,
+                       i.e. 'strict', 'replace' or 'ignore'.
+        :param buffer: Existing bytearray to reuse. Its contents are
+                       replaced with the output.
+        :param size: If given, the size of the encoded output in bytes,
+                     i.e. from measure. The buffer is allocated at this
+                     size up front and filled in place rather than
+                     growing as output is added.
+        :return: Bytearray containing the encoded output.
+        """
+        if size is not None:
+            if buffer is None:
+                buffer = bytearray(size)
+            else:
+                del buffer[size:]
+                buffer.extend(bytes(size - len(buffer)))
+            del buffer[self.dump_into(
+                buffer, encoding=encoding, errors=errors,
+            ):]
+            return buffer
+
+        if buffer is None:
+            buffer = bytearray()
+        else:
+            buffer.clear()
+
+        for chunk in self.encoded_dump_iter(
+                encoding=encoding,
+                errors=errors,
+                buffer_size=8192,
+        ):
+            buffer += chunk
+
+        return buffer
+
+    def fingerprint(
+            self, *,
+            algorithm='sha256',
+            encoding='utf-8',
+            errors='strict',
+            buffer_size=65536,
+    ) -> str:
+        """
+        Process a node tree and hash the encoded output, without holding
+        the output in memory. The result is the same as hashing a file
+        the output was written to.
+
+        :param algorithm: Name of a hash algorithm supported by hashlib.
+        :param encoding: Encoding used for the output.
+        :param errors: Error handling scheme used when encoding,
+                       i.e. 'strict', 'replace' or 'ignore'.
+        :param buffer_size: Chunks are joined together until they contain
+                            at least this many characters before being
+                            encoded and hashed.
+        :return: Hex digest of the encoded output.
+        """
+        hasher = hashlib.new(algorithm)
+        update = hasher.update
+        for chunk in self.encoded_dump_iter(
+                encoding=encoding,
+                errors=errors,
+                buffer_size=buffer_size,
+        ):
+            update(chunk)
+        return hasher.hexdigest()
+
+    def measure(self, *, encoding=None, errors='strict') -> int:
+        """
+        Process a node tree and count the size of the output, without
+        holding the output in memory. Frozen nodes memoize their output,
+        so measuring a node tree containing them before dumping it with
+        the same settings only renders them once.
+
+        :param encoding: If given, the number of bytes in the output
+                         encoded using this encoding is counted instead
+                         of the number of characters.
+        :param errors: Error handling scheme used when encoding,
+                       i.e. 'strict', 'replace' or 'ignore'.
+        :return: Size of the output.
+        """
+        if encoding is None:
+            return sum(map(len, self.dump_iter()))
+        return sum(map(len, self.encoded_dump_iter(
+            encoding=encoding,
+            errors=errors,
+        )))
+
+    def dump_into(
+            self, buffer, *,
+            encoding='utf-8',
+            errors='strict',
+            offset=0,
+    ) -> int:
+        """
+        Process and write out a node tree as encoded bytes into an
+        existing writable buffer, such as a preallocated bytearray or an
+        mmap, without resizing it.
+
+        :param buffer: Object supporting the writable buffer protocol.
+        :param encoding: Encoding used for the output.
+        :param errors: Error handling scheme used when encoding,
+                       i.e. 'strict', 'replace' or 'ignore'.
+        :param offset: Position in the buffer to start writing at.
+        :return: Position in the buffer after the end of the output.
+        """
+        with memoryview(buffer) as view:
+            size = len(view)
+            position = offset
+            for chunk in self.encoded_dump_iter(
+                    encoding=encoding,
+                    errors=errors,
+                    buffer_size=8192,
+            ):
+                end = position + len(chunk)
+                if end > size:
+                    raise ValueError(
+                        f'Output is larger than the buffer '
+                        f'({size - offset} bytes available).'
+                    )
+                view[position:end] = chunk
+                position = end
+        return position
+
+    def dump_mmap(
+            self, path, size: int, *,
+            encoding='utf-8',
+            errors='strict',
+            exact_size=False,
+    ) -> int:
+        """
+        Process and write out a node tree to a file of a known size.
+        A temporary file is created with its final size up front in the
+        same directory, then output is encoded straight into a memory map
+        of it, so the output is never held in memory as a whole. The
+        temporary file replaces the file at the given path once the
+        output is complete, so the existing file is left as it is if
+        an error occurs.
+
+        :param path: Path of file to write to.
+        :param size: Size of the encoded output in bytes, i.e. from
+                     measure. If the output is smaller, the file is
+                     truncated to fit it.
+        :param encoding: Encoding used for the output.
+        :param errors: Error handling scheme used when encoding,
+                       i.e. 'strict', 'replace' or 'ignore'.
+        :param exact_size: If True, output smaller than the given size
+                           is an error rather than being truncated.
+        :return: Number of bytes written.
         """
-        for chunk in self.dump_iter():
-            stream.write(chunk)
+        file, temp_path = open_temp_file(path)
+        try:
+            with file:
+                if size == 0:
+                    # empty files can't be memory mapped.
+                    written = self.dump_into(
+                        bytearray(), encoding=encoding, errors=errors,
+                    )
+                else:
+                    file.truncate(size)
+                    with mmap.mmap(file.fileno(), size) as buffer:
+                        written = self.dump_into(
+                            buffer, encoding=encoding, errors=errors,
+                        )
+                        buffer.flush()
+                if written < size:
+                    if exact_size:
+                        raise ValueError(
+                            f'Output is smaller than the given size '
+                            f'({written} of {size} bytes).'
+                        )
+                    file.truncate(written)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        replace_file(temp_path, path)
+        return written
 
     def dumps(self):
         """
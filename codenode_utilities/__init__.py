@@ -1,7 +1,11 @@
-from .node_transformer import node_transformer
-from .prefixer import prefixer
+from .node_transformer import (
+    node_transformer, NodeTransformer, pipeline, TransformerPipeline,
+)
+from .prefixer import prefixer, line_prefixer
 from .suffixer import suffixer
 from .joined import joined
 from .auto_coerce import auto_coerce_patch
 
-from .partitioned_node import PartitionedNode
+from .partitioned_node import (
+    PartitionedNode, CacheablePartitionedNode, ChildProducer,
+)
@@ -1,48 +1,28 @@
-# import itertools
 from codenode import newline
+from codenode.nodes.joined import Joined
 
-sentinel = object()
 
-
-def joined(nodes, *, start='', separator=newline, end=newline):
+def joined(
+        nodes, *,
+        start='',
+        separator=newline,
+        end=newline,
+) -> Joined:
     """
-    yields a starting node, then a sequence of nodes with a
-    separator between each one, then an ending node
+    returns a node which outputs a starting node, then a sequence of
+    nodes with a separator between each one, then an ending node
+
+    When dumped, if the nodes are a list or tuple of strings and the
+    separator is a string too, they are joined together using a single
+    str.join. Other lists and tuples, including with the default newline
+    separator, are interleaved with the separator in a single list rather
+    than one by one. Iterating the node yields each node in turn.
 
     :param nodes: sequence of nodes in the middle
     :param start: node at the start
     :param separator: node repeated between middle nodes
-    :param end: ending node
-    :return: iterable consisting of starting node, middle nodes with
+    :param end: node at the end
+    :return: node consisting of starting node, middle nodes with
              separators, and an ending node
     """
-    # iterator = iter(nodes)
-    #
-    # yield start
-    #
-    # try:
-    #     yield next(iterator)
-    # except StopIteration:
-    #     pass
-    # else:
-    #     yield from itertools.chain.from_iterable(
-    #         zip(
-    #             itertools.repeat(separator),
-    #             iterator,
-    #         )
-    #     )
-    #
-    # yield end
-
-    iterator = iter(nodes)
-    item = next(iterator, sentinel)
-
-    yield start
-
-    while item is not sentinel:
-        yield item
-        item = next(iterator, sentinel)
-        if item is not sentinel:
-            yield separator
-        else:
-            yield end
+    return Joined(nodes, start, separator, end)
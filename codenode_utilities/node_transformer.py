@@ -1,47 +1,248 @@
+import collections.abc
 import functools
+import typing
 
+if typing.TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Union
+    Transformer = Union['NodeTransformer', 'TransformerPipeline']
 
-def node_transformer(func):
+
+class NodeTransformer:
+    """
+    Applies a transformer function to each leaf node in a node tree,
+    i.e. strings and any nodes which aren't iterable.
+
+    The node tree is walked using an explicit stack of iterators rather
+    than recursion, so deep node trees don't hit the recursion limit.
+    Whether each type of node is a leaf is worked out once per type,
+    then looked up by exact type for every other node.
+
+    Transformed nodes are output as a flat sequence, which writers
+    process the same way as the original nested structure.
+    """
+    leaf_types: 'tuple[type, ...]' = (str,)
+    """
+    Types of nodes treated as leaves even if they are iterable.
+    """
+
+    def __init__(
+            self,
+            function: 'Callable[[Any], Any]',
+            *,
+            multiple=False,
+            leaf_types: 'tuple[type, ...]' = (),
+    ):
+        """
+        :param function: Transformer function applied to each leaf node.
+        :param multiple: If True, the transformer function returns an
+                         iterable of any number of nodes to replace each
+                         leaf node with, rather than a single node.
+        :param leaf_types: Extra types of nodes to treat as leaves for
+                           this transformer.
+        """
+        self.function = function
+        "Transformer function applied to each leaf node."
+        self.multiple = multiple
+        """
+        If True, the transformer function returns an iterable of nodes
+        rather than a single node.
+        """
+        self.leaf_types = self.leaf_types + tuple(leaf_types)
+        self.is_leaf_cache: 'dict[type, bool]' = {}
+        "Whether nodes are leaves, keyed by their exact type."
+
+    @classmethod
+    def register_leaf_type(cls, leaf_type: type) -> type:
+        """
+        Treat nodes of a type as leaves on this transformer type and its
+        subclasses, even if they are iterable. Can be used as a
+        class decorator.
+
+        :param leaf_type: Type of node.
+        :return: The same type.
+        """
+        cls.leaf_types = cls.leaf_types + (leaf_type,)
+        return leaf_type
+
+    def is_leaf_type(self, node_type: type) -> bool:
+        """
+        :param node_type: Type of node.
+        :return: True if nodes of this type are leaves.
+        """
+        return (
+            issubclass(node_type, self.leaf_types) or
+            not issubclass(node_type, collections.abc.Iterable)
+        )
+
+    def transform_iter(self, node) -> 'Iterable':
+        """
+        Walk a node tree, yielding the result of the transformer function
+        for each leaf node.
+
+        :param node: Base node of node tree.
+        :return: Iterable of transformed nodes.
+        """
+        function = self.function
+        multiple = self.multiple
+        is_leaf_cache = self.is_leaf_cache
+        stack = [iter((node,))]
+        while stack:
+            top = stack[-1]
+            for item in top:
+                item_type = type(item)
+                try:
+                    is_leaf = is_leaf_cache[item_type]
+                except KeyError:
+                    is_leaf = is_leaf_cache[item_type] = \
+                        self.is_leaf_type(item_type)
+
+                if is_leaf:
+                    if multiple:
+                        yield from function(item)
+                    else:
+                        yield function(item)
+                else:
+                    stack.append(iter(item))
+                    break
+            else:
+                stack.pop()
+
+    def materialize(self, node) -> list:
+        """
+        Transform a whole node tree at once. Unlike the iterable returned
+        by calling the transformer, the result can be dumped many times.
+
+        :param node: Base node of node tree.
+        :return: List of transformed nodes.
+        """
+        return list(self.transform_iter(node))
+
+    def __call__(self, node) -> 'Iterable':
+        """
+        :param node: Base node of node tree.
+        :return: Iterable of transformed nodes, produced lazily as it
+                 is iterated over.
+        """
+        return self.transform_iter(node)
+
+    def __repr__(self):
+        return f'<NodeTransformer {self.function!r}>'
+
+
+def node_transformer(
+        func=None,
+        *,
+        multiple=False,
+        leaf_types: 'tuple[type, ...]' = (),
+):
     """
     decorator for creating functions that are used to
     recursively transform node trees.
 
+    Can be used either directly or called with keyword arguments,
+    i.e. ``@node_transformer(multiple=True)``.
+
     :param func: transformer function applied to each node
-    :return: a function which recursively applies the transformer
+    :param multiple: If True, the transformer function returns an
+                     iterable of any number of nodes to replace each
+                     node with, rather than a single node.
+    :param leaf_types: Extra types of nodes which the transformer
+                       function is applied to as a whole, rather than
+                       to each of their items.
+    :return: a NodeTransformer which applies the transformer
              function to each node in the tree.
     """
-    @functools.wraps(func)
-    def wrapper(node):
-        if isinstance(node, str):
-            yield func(node)
-        else:
-            try:
-                yield from map(wrapper, node)
-            except TypeError:
-                yield func(node)
-    return wrapper
-
-
-# class NodeTransformer:
-#     """
-#     has a repr for extra debug info
-#     """
-#
-#     def __init__(self, node):
-#         self.node = node
-#
-#     def transform(self, node):
-#         raise NotImplementedError
-#
-#     def __iter__(self):
-#         if isinstance(self.node, str):
-#             yield self.transform(self.node)
-#         else:
-#             try:
-#                 yield from map(type(self), self.node)
-#             except TypeError:
-#                 yield self.transform(self.node)
-#
-#     def __repr__(self):
-#         return f'{super().__repr__()}({self.node})'
-#
+    if func is None:
+        return functools.partial(
+            node_transformer,
+            multiple=multiple,
+            leaf_types=leaf_types,
+        )
+
+    transformer = NodeTransformer(
+        func,
+        multiple=multiple,
+        leaf_types=leaf_types,
+    )
+    functools.update_wrapper(transformer, func)
+    return transformer
+
+
+class TransformerPipeline:
+    """
+    Applies several node transformers to a node tree, one after another.
+
+    Produces the same output as applying each transformer to the output
+    of the previous one. The node tree is only walked once, by the first
+    transformer. Since transformers output a flat sequence of nodes,
+    every other transformer just passes each node to its transformer
+    function, only walking into subtrees returned by earlier transformer
+    functions.
+    """
+    def __init__(
+            self,
+            transformers: 'Iterable[Union[Transformer, Callable[[Any], Any]]]',
+    ):
+        """
+        :param transformers: Node transformers in the order they are
+                             applied. Pipelines are expanded into their
+                             transformers, and any other callables are
+                             used as transformer functions.
+        """
+        stages = []
+        for transformer in transformers:
+            if isinstance(transformer, TransformerPipeline):
+                stages.extend(transformer.transformers)
+            elif isinstance(transformer, NodeTransformer):
+                stages.append(transformer)
+            else:
+                stages.append(NodeTransformer(transformer))
+
+        self.transformers: 'tuple[NodeTransformer, ...]' = tuple(stages)
+        "Node transformers in the order they are applied."
+
+    def transform_iter(self, node) -> 'Iterable':
+        """
+        Walk a node tree, yielding the result of applying each transformer
+        in turn to each leaf node.
+
+        :param node: Base node of node tree.
+        :return: Iterable of transformed nodes.
+        """
+        nodes = (node,)
+        for transformer in self.transformers:
+            nodes = transformer.transform_iter(nodes)
+        return iter(nodes)
+
+    def materialize(self, node) -> list:
+        """
+        Transform a whole node tree at once. Unlike the iterable returned
+        by calling the pipeline, the result can be dumped many times.
+
+        :param node: Base node of node tree.
+        :return: List of transformed nodes.
+        """
+        return list(self.transform_iter(node))
+
+    def __call__(self, node) -> 'Iterable':
+        """
+        :param node: Base node of node tree.
+        :return: Iterable of transformed nodes, produced lazily as it
+                 is iterated over.
+        """
+        return self.transform_iter(node)
+
+    def __repr__(self):
+        return f'<TransformerPipeline ({len(self.transformers)} stages)>'
+
+
+def pipeline(*transformers) -> TransformerPipeline:
+    """
+    Combine node transformers into one which applies each of them in
+    order, walking the node tree only once.
+
+    :param transformers: Node transformers, or transformer functions,
+                         in the order they are applied.
+    :return: A TransformerPipeline.
+    """
+    return TransformerPipeline(transformers)
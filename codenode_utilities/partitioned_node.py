@@ -1,9 +1,71 @@
 from codenode import indent, dedent, dump, dumps
+from codenode.nodes.cacheable import CacheableNode
 
+import itertools
 import typing
 
 T = typing.TypeVar('T')
 
+if typing.TYPE_CHECKING:
+    from typing import Callable, Iterable, Optional, Union
+    Producer = Union[Iterable, Callable[[], Iterable]]
+
+
+class ChildProducer:
+    """
+    A node which pulls child nodes from a producer only while it is
+    being processed, so the children are never all held in memory.
+    Added to a partitioned node's children by add_producer.
+    """
+    def __init__(
+            self,
+            producer: 'Producer',
+            batch_size: 'Optional[int]' = None,
+    ):
+        """
+        :param producer: Iterable of child nodes, i.e. a generator or
+                         database cursor, or a callable with no arguments
+                         that returns one.
+        :param batch_size: If given, children are pulled from the
+                           producer this many at a time.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError('batch_size must be at least 1.')
+
+        self.producer = producer
+        """
+        Iterable of child nodes, or a callable with no arguments that
+        returns one.
+        """
+        self.batch_size = batch_size
+        """
+        If given, children are pulled from the producer this many at
+        a time.
+        """
+
+    def batches(self, children: 'Iterable') -> 'Iterable':
+        """
+        :param children: Iterable of child nodes.
+        :return: Iterable of tuples of up to batch_size child nodes.
+        """
+        iterator = iter(children)
+        batch_size = self.batch_size
+        while True:
+            batch = tuple(itertools.islice(iterator, batch_size))
+            if not batch:
+                break
+            yield batch
+
+    def __iter__(self):
+        producer = self.producer
+        children = producer() if callable(producer) else producer
+        if self.batch_size is None:
+            return iter(children)
+        return self.batches(children)
+
+    def __repr__(self):
+        return f'<ChildProducer {self.producer!r}>'
+
 
 class PartitionedNode:
     """
@@ -68,6 +130,32 @@ class PartitionedNode:
         self.children.extend(nodes)
         return nodes
 
+    def add_producer(
+            self,
+            producer: 'Producer',
+            *,
+            batch_size: 'Optional[int]' = None,
+    ) -> ChildProducer:
+        """
+        Add children which are produced lazily while this node's body is
+        processed, rather than stored up front. Each child can be
+        discarded once it has been processed, so memory use doesn't grow
+        with the number of children.
+
+        Iterators can only be processed once. Pass a callable that
+        returns a new iterable instead to dump this node more than once.
+
+        :param producer: Iterable of child nodes, i.e. a generator or
+                         database cursor, or a callable with no arguments
+                         that returns one, which is called each time the
+                         body is processed.
+        :param batch_size: If given, children are pulled from the
+                           producer this many at a time.
+        :return: Node added to this node's children in place of the
+                 produced children.
+        """
+        return self.add_child(ChildProducer(producer, batch_size))
+
     def dump(
             self, stream, *,
             indentation='    ',
@@ -84,6 +172,8 @@ class PartitionedNode:
         :param depth: Base depth (i.e. number of indents) to start at.
         :param debug: If True, will print out extra info when an error
                       occurs to give a better idea of which node caused it.
+                      If 'lazy', the same info is worked out after an
+                      error occurs instead, with almost no overhead.
         """
         return dump(
             self,
@@ -109,6 +199,8 @@ class PartitionedNode:
         :param depth: Base depth (i.e. number of indents) to start at.
         :param debug: If True, will print out extra info when an error
                       occurs to give a better idea of which node caused it.
+                      If 'lazy', the same info is worked out after an
+                      error occurs instead, with almost no overhead.
 
         :return: String representation of node.
         """
@@ -119,3 +211,31 @@ class PartitionedNode:
             depth=depth,
             debug=debug,
         )
+
+
+class CacheablePartitionedNode(CacheableNode, PartitionedNode):
+    """
+    A partitioned node whose output can be reused by writers with a
+    subtree cache, i.e. codenode.dump/dumps with the cache parameter.
+
+    Output is reused for as long as the node's key stays the same, so it
+    should be changed whenever the node's output would, i.e. by
+    including a version number or a hash of whatever the node's output is
+    built from.
+    """
+    def __init__(self, key=None):
+        """
+        :param key: Hashable key identifying this node's output among
+                    other nodes of the same type, or None to not cache it.
+        """
+        super().__init__()
+        self.key = key
+        """
+        Hashable key identifying this node's output among other nodes of
+        the same type, or None to not cache it.
+        """
+
+    def cache_key(self):
+        if self.key is None:
+            return None
+        return type(self), self.key
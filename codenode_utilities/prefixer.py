@@ -1,108 +1,25 @@
 import codenode
-import io
 import typing
 
-# from .node_transformer import node_transformer
-# from codenode.nodes.indentation import AbsoluteIndentation, CurrentIndentation
-# from codenode.nodes.depth_change import RelativeDepthChange
-#
-#
-# def prefixer(prefix):
-#     """
-#
-#     :param prefix:
-#     :return:
-#     """
-#     def prefixed(node):
-#         indents = 0
-#
-#         @node_transformer
-#         def transform(node):
-#             nonlocal indents
-#             if isinstance(node, RelativeDepthChange):
-#                 indents += node.offset
-#                 yield node
-#             elif isinstance(node, CurrentIndentation):
-#                 yield RelativeDepthChange(-indents)
-#                 yield node
-#                 yield prefix
-#                 yield AbsoluteIndentation(indents)
-#                 yield RelativeDepthChange(indents)
-#             else:
-#                 yield node
-#
-#         yield from transform(node)
-#     return prefixed
-
-
-# from .node_transformer import NodeTransformer
-#
-#
-# def prefixer(prefix: str):
-#     def prefixed(node):
-#         indents = 0
-#
-#         class Prefixer(NodeTransformer):
-#             def transform(self, node):
-#                 nonlocal indents
-#                 if isinstance(node, RelativeDepthChange):
-#                     indents += node.offset
-#                     yield node
-#                 elif isinstance(node, CurrentIndentation):
-#                     yield RelativeDepthChange(-indents)
-#                     yield node
-#                     yield prefix
-#                     yield AbsoluteIndentation(indents)
-#                     yield RelativeDepthChange(indents)
-#                 else:
-#                     yield node
-#
-#         return Prefixer(node)
-#
-#     return prefixed
-
-# import inspect
-#
-# def get_writer_type():
-#     stack = inspect.stack()
-#     for frame_info in stack:
-#         try:
-#             cls = frame_info.frame.f_locals['__class__']
-#         except KeyError:
-#             continue
-#         else:
-#             if issubclass(cls, codenode.Writer):
-#                 return cls
-#
-#
+from codenode.nodes.line_prefix import PushLinePrefix, PopLinePrefix
+from codenode.nodes.writer_context import WriterCallback
+
+pop_line_prefix = PopLinePrefix.of()
+
+
 def yield_lines(iterator: typing.Iterable[str]):
-    buffer = io.StringIO()
+    buffer = []
     for chunk in iterator:
-        newline_position = chunk.find('\n')
-        if newline_position >= 0:
-            buffer.write(chunk[:newline_position])
-            yield buffer.getvalue()
-            buffer.seek(0)
-            buffer.write(chunk[newline_position+1:])
-            buffer.truncate()
-        else:
-            buffer.write(chunk)
-    if buffer.tell():
-        yield buffer.getvalue()
-#
-#
-# def prefixer(prefix: str):
-#     def prefixed(
-#             node,
-#             dump_iter=None,
-#     ):
-#         if dump_iter is None:
-#             writer_type = get_writer_type()
-#             dump_iter = lambda node: writer_type(node).dump_iter()
-#
-#         for line_content in yield_lines(dump_iter(node)):
-#             yield codenode.line(f'{prefix}{line_content}')
-#     return prefixed
+        first, *rest = chunk.split('\n')
+        buffer.append(first)
+        if rest:
+            yield ''.join(buffer)
+            *complete, last = rest
+            yield from complete
+            buffer = [last]
+    remainder = ''.join(buffer)
+    if remainder:
+        yield remainder
 
 
 def prefixer(prefix: str):
@@ -110,6 +27,10 @@ def prefixer(prefix: str):
     Returns a node transformer that adds a string to the
     start of every line in the output of a node.
 
+    See line_prefixer for a version that adds the prefix while the outer
+    writer processes the node, rather than rendering it to a
+    string first.
+
     :param prefix: String to place at the start of lines.
     :return: A function that takes a node as an argument,
              along with a function to convert a node to a string
@@ -126,6 +47,31 @@ def prefixer(prefix: str):
     return prefixed
 
 
+def line_prefixer(prefix: str):
+    """
+    Returns a node transformer that adds a string to the
+    start of every indented line in the output of a node.
+
+    The prefix is placed after the indentation for the depth at which
+    the node is processed, and before any further indentation inside
+    the node. Output is processed in a single pass using the outer
+    writer's indentation and newline strings.
+
+    Prefixes are added by indentation nodes, so lines that don't start
+    with one (i.e. empty lines, or text after a newline inside a string)
+    are left unprefixed, unlike with prefixer.
+
+    :param prefix: String to place at the start of lines.
+    :return: A function that takes a node as an argument and returns
+             it wrapped in nodes that add and remove the line prefix.
+    """
+    push_prefix = PushLinePrefix(prefix)
+
+    def prefixed(node):
+        return push_prefix, node, pop_line_prefix
+    return prefixed
+
+
 def prefixer_iter(prefix: str):
     """
     Returns a node transformer that adds a string to the
@@ -134,16 +80,53 @@ def prefixer_iter(prefix: str):
 
     :param prefix: String to place at the start of lines.
     :return: A function that takes a node as an argument,
-             along with a function to convert a node to an iterable of
-             strings (i.e. codenode.Writer.dump_iter).
+             along with an optional function to convert a node to an
+             iterable of strings (i.e. codenode.Writer.dump_iter).
              It calls this function with the given node, then returns
              new nodes containing each line in the output along with the
-             prefix at the start.
+             prefix at the start. By default, the node is rendered using
+             a sub writer of the writer processing the returned nodes,
+             or the default writer type and settings if the returned
+             nodes are iterated over directly (see SubWriterCallback).
     """
+    def prefixed_lines(node, dump_iter):
+        for line_content in yield_lines(dump_iter(node)):
+            yield codenode.line(f'{prefix}{line_content}')
+
     def prefixed(
             node,
-            dump_iter=lambda node: codenode.default_writer_type(node).dump_iter()
+            dump_iter=None,
     ):
-        for line_content in yield_lines(dump_iter(node)):
-            yield codenode.line(f'{prefix}{line_content}')
+        if dump_iter is None:
+            return SubWriterCallback(
+                lambda writer: prefixed_lines(node, sub_dump_iter(writer))
+            )
+        return prefixed_lines(node, dump_iter)
     return prefixed
+
+
+class SubWriterCallback(WriterCallback):
+    """
+    Nodes that render part of a node tree using the writer processing
+    them, i.e. through a sub writer.
+
+    Unlike other writer callbacks, they can also be iterated over
+    outside of a writer, i.e. by freeze or a node transformer, in which
+    case the function is called with a writer of the default type and
+    settings.
+    """
+    def __iter__(self):
+        return iter(self.function(codenode.default_writer_type(())))
+
+    def __repr__(self):
+        return f'<SubWriterCallback {self.function!r}>'
+
+
+def sub_dump_iter(writer: codenode.Writer):
+    """
+    :param writer: Writer processing a node tree.
+    :return: Function that converts a node to an iterable of strings
+             using a sub writer of the given writer. Lines are split
+             using '\\n' regardless of the writer's newline string.
+    """
+    return lambda node: writer.sub_writer(node, newline='\n').dump_iter()
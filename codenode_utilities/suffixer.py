@@ -1,31 +1,144 @@
-import codenode
+import itertools
+import typing
+
 from codenode import indentation, newline
 
+from .prefixer import yield_lines, sub_dump_iter, SubWriterCallback
+
+if typing.TYPE_CHECKING:
+    from typing import Callable, Iterable, Optional
+
+
+def max_line_length(chunks: 'Iterable[str]') -> int:
+    """
+    Find the length of the longest line in some output without joining
+    it together.
+
+    :param chunks: Iterable of string chunks.
+    :return: Number of characters in the longest line.
+    """
+    longest = current = 0
+    for chunk in chunks:
+        start = 0
+        index = chunk.find('\n')
+        while index != -1:
+            current += index - start
+            if current > longest:
+                longest = current
+            current = 0
+            start = index + 1
+            index = chunk.find('\n', start)
+        current += len(chunk) - start
+    return max(longest, current)
+
+
+def suffixed_lines(line_texts: 'Iterable[str]', width: int, suffix: str):
+    """
+    :param line_texts: Content of each line.
+    :param width: Column to pad each line to before the suffix.
+    :param suffix: String to place at the end of lines.
+    :return: Nodes for each line with padding and the suffix added.
+    """
+    for line_text in line_texts:
+        yield indentation
+        yield line_text
+        yield ' ' * (width - len(line_text))
+        yield suffix
+        yield newline
+
 
 def suffixer(
         suffix: str,
-        dumps=lambda node: codenode.dumps(node),
+        dumps: 'Optional[Callable[[object], str]]' = None,
+        *,
+        column: 'Optional[int]' = None,
+        window: 'Optional[int]' = None,
+        measure=False,
+        dump_iter: 'Optional[Callable[[object], Iterable[str]]]' = None,
 ):
     """
     Returns a node transformer that adds a string to the
     end of every line in the output of a node. Padding is added
     automatically to align all suffixes to the end of the longest line.
 
+    By default the whole output of the node is rendered to a string
+    before anything is returned. The column, window and measure
+    parameters select modes which instead process the output line by
+    line, so memory use doesn't grow with the size of the node.
+
     :param suffix: String to place at the end of lines.
-    :return: A function that takes a node as an argument,
-             along with a function to convert a node to a string
-             (i.e. codenode.dumps). It calls this function with
-             the given node, then returns new nodes containing each
-             line in the string along with the suffix at the end.
+    :param dumps: Function to convert a node to a string,
+                  used by the default mode. By default, the node is
+                  rendered using a sub writer of the writer processing
+                  the returned nodes.
+    :param column: If given, suffixes are aligned to this column instead
+                   of the end of the longest line. Lines reaching past it
+                   are followed directly by the suffix.
+    :param window: If given, lines are processed in groups of this many
+                   lines, with suffixes aligned to the end of the longest
+                   line in each group.
+    :param measure: If True, the node is processed twice, first to find
+                    the length of the longest line without storing any
+                    output, then to output each line. The node must be
+                    iterable more than once, i.e. not a generator.
+    :param dump_iter: Function to convert a node to an iterable of
+                      strings (i.e. codenode.Writer.dump_iter),
+                      used by the column, window and measure modes.
+                      By default, the node is rendered using a sub writer
+                      of the writer processing the returned nodes.
+    :return: A function that takes a node as an argument. It calls the
+             dumps or dump_iter function with the given node, then
+             returns new nodes containing each line in the output along
+             with the suffix at the end. When the function used isn't
+             given, the returned nodes can still be iterated over
+             directly, i.e. by freeze, using the default writer type
+             and settings (see SubWriterCallback).
     """
+    if sum((column is not None, window is not None, bool(measure))) > 1:
+        raise ValueError(
+            'Only one of column, window and measure can be used at once.'
+        )
+    if window is not None and window < 1:
+        raise ValueError('window must be at least 1.')
+
+    def suffixed_output(node, dumps, dump_iter):
+        if column is not None:
+            yield from suffixed_lines(
+                yield_lines(dump_iter(node)), column, suffix,
+            )
+        elif window is not None:
+            output_lines = yield_lines(dump_iter(node))
+            while True:
+                group = list(itertools.islice(output_lines, window))
+                if not group:
+                    break
+                yield from suffixed_lines(
+                    group, max(map(len, group)), suffix,
+                )
+        elif measure:
+            width = max_line_length(dump_iter(node))
+            yield from suffixed_lines(
+                yield_lines(dump_iter(node)), width, suffix,
+            )
+        else:
+            output_lines = dumps(node).splitlines()
+            yield from suffixed_lines(
+                output_lines, max(map(len, output_lines)), suffix,
+            )
+
+    streamed = column is not None or window is not None or measure
+
     def suffixed(node):
-        output_lines = dumps(node).splitlines()
-        max_line_length = max(map(len, output_lines))
-        for line_text in output_lines:
-            yield indentation
-            yield line_text
-            yield ' ' * (max_line_length - len(line_text))
-            yield suffix
-            yield newline
+        if (dump_iter if streamed else dumps) is None:
+            return SubWriterCallback(
+                lambda writer: suffixed_output(
+                    node,
+                    dumps or (
+                        lambda node: writer.sub_writer(node).dumps()
+                    ),
+                    dump_iter or sub_dump_iter(writer),
+                )
+            )
+        return suffixed_output(node, dumps, dump_iter)
 
     return suffixed
@@ -10,12 +10,18 @@ output_path = cd.parent / 'codenode_utilities' / 'README.md'
 
 contents = (
     ClassDocumentation('codenode_utilities.PartitionedNode'),
+    ClassDocumentation('codenode_utilities.CacheablePartitionedNode'),
+    ClassDocumentation('codenode_utilities.ChildProducer'),
+    ClassDocumentation('codenode_utilities.NodeTransformer'),
+    ClassDocumentation('codenode_utilities.TransformerPipeline'),
 
     *functions(
         (
             'codenode_utilities.joined',
             'codenode_utilities.node_transformer',
+            'codenode_utilities.pipeline',
             'codenode_utilities.prefixer',
+            'codenode_utilities.line_prefixer',
             'codenode_utilities.suffixer',
             'codenode_utilities.auto_coerce_patch',
         )
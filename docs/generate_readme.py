@@ -15,6 +15,14 @@ contents = (
         (
             'codenode.dump',
             'codenode.dumps',
+            'codenode.dumps_range',
+            'codenode.dump_bytes',
+            'codenode.dumpb',
+            'codenode.adump',
+            'codenode.measure',
+            'codenode.dump_mmap',
+            'codenode.fingerprint',
+            'codenode.dump_if_changed',
             'codenode.line',
         )
     ),
@@ -33,6 +41,9 @@ contents = (
             'codenode.lines',
             'codenode.empty_lines',
             'codenode.indented',
+            'codenode.freeze',
+            'codenode.with_writer',
+            'codenode.dump_many',
         )
     ),
 
@@ -42,6 +53,8 @@ contents = (
         (
             'codenode.writer.Writer',
             'codenode.writer.WriterStack',
+            'codenode.fast_writer.FastWriter',
+            'codenode.async_writer.AsyncWriter',
 
             'codenode.nodes.newline.Newline',
 
@@ -54,6 +67,26 @@ contents = (
             'codenode.nodes.indentation.AbsoluteIndentation',
             'codenode.nodes.indentation.CurrentIndentation',
 
+            'codenode.nodes.frozen.FrozenNode',
+
+            'codenode.nodes.line_prefix.LinePrefixChange',
+            'codenode.nodes.line_prefix.PushLinePrefix',
+            'codenode.nodes.line_prefix.PopLinePrefix',
+
+            'codenode.nodes.writer_context.WriterContextNode',
+            'codenode.nodes.writer_context.WriterCallback',
+
+            'codenode.nodes.joined.Joined',
+            'codenode.nodes.buffer.NodeBuffer',
+            'codenode.nodes.cacheable.CacheableNode',
+            'codenode.subtree_cache.SubtreeCache',
+            'codenode.file_sink.ChangedFileSink',
+            'codenode.line_index.LineIndex',
+
+            'codenode.profiler.RenderProfile',
+            'codenode.profiler.ProfileEntry',
+            'codenode.source_map.SourceMap',
+
             # 'codenode.debug.DebugIterator',
         )
     ),
@@ -62,6 +95,9 @@ contents = (
         (
             # 'codenode.debug.print_writer_stack',
             'codenode.debug.debug_patch',
+            'codenode.debug.lazy_debug_patch',
+            'codenode.profiler.profile_patch',
+            'codenode.source_map.source_map_patch',
         )
     ),
 )
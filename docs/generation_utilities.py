@@ -27,7 +27,7 @@ def get_signature(function: types.FunctionType):
     source = inspect.getsource(function)
     node = ast.parse(textwrap.dedent(source))
     for child in ast.walk(node):
-        if isinstance(child, ast.FunctionDef):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
             result = f'({ast.unparse(child.args)})'
             if child.returns:
                 result += f' -> {ast.unparse(child.returns)}'
@@ -75,7 +75,11 @@ def get_docstring_info(docstring):
 def get_function_documentation(function: types.FunctionType):
     return {
         'name': function.__name__,
-        'signature': f'def {function.__name__}{get_signature(function)}',
+        'signature': ''.join((
+            'async ' if inspect.iscoroutinefunction(function) or
+            inspect.isasyncgenfunction(function) else '',
+            f'def {function.__name__}{get_signature(function)}',
+        )),
         **get_docstring_info(function.__doc__),
     }
 
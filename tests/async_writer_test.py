@@ -0,0 +1,89 @@
+import asyncio
+
+import codenode
+from codenode import line, indent, dedent, indentation, newline
+
+
+async def async_lines(count):
+    for i in range(count):
+        await asyncio.sleep(0)
+        yield line(f'print({i})')
+
+
+async def async_name():
+    await asyncio.sleep(0)
+    return 'def f():'
+
+
+def tree(count):
+    return [
+        (indentation, async_name(), newline),
+        indent,
+        async_lines(count),
+        dedent,
+    ]
+
+
+def expected(count):
+    return codenode.dumps([
+        line('def f():'),
+        indent,
+        [line(f'print({i})') for i in range(count)],
+        dedent,
+    ])
+
+
+class StreamWriter:
+    def __init__(self):
+        self.data = bytearray()
+        self.drains = 0
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        self.drains += 1
+
+
+async def run():
+    assert await codenode.AsyncWriter(tree(3)).adumps() == expected(3)
+
+    stream = StreamWriter()
+    await codenode.adump(tree(50), stream, encoding='utf-8', buffer_size=64)
+    assert stream.data.decode() == expected(50)
+    assert stream.drains > 1
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    class SlowlyYieldingWriter(codenode.AsyncWriter):
+        yield_interval = 10
+
+    task = asyncio.ensure_future(ticker())
+    node = [line(str(i)) for i in range(100)]
+    assert await SlowlyYieldingWriter(node).adumps() == codenode.dumps(node)
+    task.cancel()
+    assert ticks >= 30
+
+    async def broken():
+        yield line(object())
+
+    try:
+        await codenode.adump(broken(), StreamWriter(), debug=True)
+    except TypeError as error:
+        assert 'Writer stack:' in str(error)
+    else:
+        raise AssertionError('expected TypeError')
+
+
+def async_writer_test():
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    async_writer_test()
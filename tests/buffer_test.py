@@ -0,0 +1,80 @@
+import codenode
+from codenode import line, lines, indented, empty_lines, freeze, NodeBuffer
+from codenode_utilities import line_prefixer
+
+
+def build_buffer():
+    buffer = NodeBuffer()
+    buffer.line('def f():')
+    with buffer.indented():
+        buffer.lines('a = 1', 'b = 2')
+        buffer.empty_lines(1)
+        buffer.line(('return ', 'a + b'))
+    buffer.append(line('x = f()'))
+    buffer.append((line(name) for name in ('y', 'z')))
+    buffer.indent().line('w').dedent()
+    return buffer
+
+
+def build_tree():
+    return [
+        line('def f():'),
+        indented(
+            lines('a = 1', 'b = 2'),
+            empty_lines(1),
+            line(('return ', 'a + b')),
+        ),
+        line('x = f()'),
+        (line(name) for name in ('y', 'z')),
+        indented(line('w')),
+    ]
+
+
+def equivalence_test():
+    expected = codenode.dumps(build_tree())
+    for writer_type in (
+            codenode.Writer,
+            codenode.FastWriter,
+            codenode.debug_patch(codenode.Writer),
+    ):
+        for options in ({}, {'indentation': '\t', 'depth': 1}):
+            assert writer_type(build_buffer(), **options).dumps() == \
+                writer_type(build_tree(), **options).dumps()
+
+    assert codenode.dumps([build_buffer(), line('end')]) == \
+        expected + 'end\n'
+    assert codenode.dumps(freeze(build_buffer())) == expected
+    assert codenode.dumps(list(build_buffer())) == expected
+    assert codenode.dumps(line_prefixer('# ')(build_buffer())) == \
+        codenode.dumps(line_prefixer('# ')(build_tree()))
+
+
+def compact_storage_test():
+    buffer = NodeBuffer()
+    for i in range(3):
+        buffer.line('pass')
+    assert buffer.strings == ['pass'] * 3
+    assert buffer.string_table is None
+    assert buffer.string_indices is None
+
+    buffer = NodeBuffer(intern_strings=True)
+    for i in range(1000):
+        buffer.line('pass')
+    assert buffer.strings == ['pass']
+    assert len(buffer.string_indices) == 1000
+    assert len(buffer.opcodes) == 3000
+    assert buffer.nodes == []
+
+    buffer.batch_size = 7
+    chunks = list(codenode.Writer(buffer).dump_iter())
+    assert len(chunks) == 143
+    assert ''.join(chunks) == 'pass\n' * 1000
+
+
+def buffer_test():
+    equivalence_test()
+    compact_storage_test()
+
+
+if __name__ == '__main__':
+    buffer_test()
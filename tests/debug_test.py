@@ -0,0 +1,50 @@
+import codenode
+from codenode import line, lines, indented
+
+
+class Broken:
+    def __repr__(self):
+        return '<Broken>'
+
+
+def tree():
+    def body():
+        yield line('a = 1')
+        yield line(Broken())
+
+    return [
+        lines('import os', 'import sys'),
+        line('def f():'),
+        indented(body()),
+    ]
+
+
+def error_message(writer_type) -> str:
+    try:
+        writer_type(tree()).dumps()
+    except TypeError as error:
+        return str(error)
+    else:
+        raise AssertionError('expected TypeError')
+
+
+def debug_test():
+    for writer_type in (codenode.Writer, codenode.FastWriter):
+        eager = error_message(codenode.debug_patch(writer_type))
+        lazy = error_message(codenode.lazy_debug_patch(writer_type))
+
+        for message in (eager, lazy):
+            assert 'Writer stack:' in message
+            assert 'item 1: <Broken>' in message
+            assert 'suspended at line' in message
+
+        # the list at the base of the tree has processed its third item.
+        assert "last 3 items processed: (3 total)" in lazy
+
+    node = tree()[:2]
+    for debug in (False, True, 'lazy'):
+        assert codenode.dumps(node, debug=debug) == codenode.dumps(node)
+
+
+if __name__ == '__main__':
+    debug_test()
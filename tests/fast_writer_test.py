@@ -0,0 +1,90 @@
+import codenode
+from codenode import (
+    line, lines, indent, dedent, indented,
+    indentation, newline,
+)
+from codenode.fast_writer import FastWriter
+from codenode.nodes.depth_change import AbsoluteDepthChange
+from codenode.nodes.indentation import AbsoluteIndentation, RelativeIndentation
+
+
+class Name(str):
+    pass
+
+
+class Call:
+    def __init__(self, name, *args):
+        self.name = name
+        self.args = args
+
+
+def generator():
+    yield line('def test():')
+    yield indent
+    for i in range(4):
+        yield indentation, 'print(', str(i), ')', newline
+    yield dedent
+
+
+def tree():
+    return [
+        lines('a', 'b'),
+        indented(
+            line(Name('c')),
+            AbsoluteDepthChange(3),
+            line('d'),
+            (AbsoluteIndentation(1), 'e', newline),
+            (RelativeIndentation(-1), 'f', newline),
+        ),
+        generator(),
+        [[[]], ()],
+    ]
+
+
+def fast_writer_test():
+    for options in (
+        {},
+        {'indentation': '\t', 'newline': '\r\n', 'depth': 2},
+    ):
+        expected = codenode.Writer(tree(), **options).dumps()
+        assert FastWriter(tree(), **options).dumps() == expected
+        assert ''.join(FastWriter(tree(), **options).dump_iter()) == expected
+
+    class BatchedWriter(FastWriter):
+        batch_size = 1
+
+    assert BatchedWriter(tree()).dumps() == codenode.dumps(tree())
+
+    # flat sequences of strings are still split into batches.
+    strings = [str(i) for i in range(10000)]
+    chunks = list(FastWriter(strings).dump_iter())
+    assert ''.join(chunks) == ''.join(strings)
+    assert len(chunks) == -(-len(strings) // FastWriter.batch_size)
+
+    class CallWriter(FastWriter):
+        pass
+
+    @CallWriter.register(Call)
+    def handle_call(writer, node):
+        writer.stack.push((node.name, '(', ', '.join(node.args), ')'))
+
+    assert CallWriter(line(Call('f', 'x', 'y'))).dumps() == 'f(x, y)\n'
+    assert Call not in FastWriter.handlers
+
+    try:
+        FastWriter([line(object())]).dumps()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('expected TypeError')
+
+    try:
+        codenode.debug_patch(FastWriter)([line(1)]).dumps()
+    except TypeError as error:
+        assert 'Writer stack:' in str(error)
+    else:
+        raise AssertionError('expected TypeError')
+
+
+if __name__ == '__main__':
+    fast_writer_test()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+
+import codenode
+from codenode import line, lines, indented, ChangedFileSink
+
+
+def build(name='a'):
+    return [line(f'def {name}():'), indented(lines('x = 1', 'return x'))]
+
+
+def read(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def temp_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith('.tmp')]
+
+
+def file_sink_test():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'output.py')
+        expected = codenode.dumps(build()).encode()
+
+        # new files are written.
+        assert codenode.dump_if_changed(build(), path)
+        assert read(path) == expected
+
+        # unchanged files aren't written.
+        modified = os.stat(path).st_mtime_ns
+        os.utime(path, ns=(modified - 10 ** 9, modified - 10 ** 9))
+        modified = os.stat(path).st_mtime_ns
+        assert not codenode.dump_if_changed(build(), path)
+        assert not codenode.dump_if_changed(build(), path, buffer_size=1)
+        assert os.stat(path).st_mtime_ns == modified
+
+        # changes at the start, middle and end, and changes in length.
+        for node in (
+                build('b'),
+                build('a') + [line('extra')],
+                build('a')[:1],
+                [],
+                build('é'),
+                build('a'),
+        ):
+            for buffer_size in (1, 65536):
+                with open(path, 'wb') as file:
+                    file.write(b'old contents\n')
+                assert codenode.dump_if_changed(
+                    node, path, buffer_size=buffer_size,
+                )
+                assert read(path) == codenode.dumps(node).encode()
+                assert not codenode.dump_if_changed(node, path)
+
+        # encodings and newlines are compared as written.
+        assert codenode.dump_if_changed(build(), path, newline='\r\n')
+        assert read(path) == expected.replace(b'\n', b'\r\n')
+        assert codenode.dump_if_changed(build(), path, encoding='utf-16')
+        assert read(path) == codenode.dumps(build()).encode('utf-16')
+        assert not codenode.dump_if_changed(build(), path, encoding='utf-16')
+
+        # existing file permissions are kept.
+        os.chmod(path, 0o640)
+        assert codenode.dump_if_changed(build('c'), path)
+        assert os.stat(path).st_mode & 0o777 == 0o640
+
+        # errors leave the existing file as it is.
+        def failing():
+            yield line('def c():')
+            raise ValueError
+        try:
+            codenode.dump_if_changed(failing(), path, buffer_size=1)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError
+        assert read(path) == codenode.dumps(build('c')).encode()
+        assert not temp_files(directory)
+
+        # the sink can be used directly with any writer.
+        with ChangedFileSink(path) as sink:
+            codenode.FastWriter(build('c')).dump(sink)
+        assert not sink.changed
+        with ChangedFileSink(path) as sink:
+            codenode.FastWriter(build('d')).dump(sink)
+        assert sink.changed
+        assert read(path) == codenode.dumps(build('d')).encode()
+        assert not temp_files(directory)
+
+        # dump_many only writes changed files.
+        paths = [os.path.join(directory, f'{i}.py') for i in range(3)]
+        nodes = {path: build() for path in paths}
+        codenode.dump_many(nodes, executor='thread', if_changed=True)
+        for path in paths:
+            assert read(path) == expected
+            os.utime(path, ns=(0, 0))
+        nodes[paths[1]] = build('b')
+        codenode.dump_many(nodes, executor='thread', if_changed=True)
+        assert [os.stat(path).st_mtime_ns == 0 for path in paths] == \
+            [True, False, True]
+
+
+if __name__ == '__main__':
+    file_sink_test()
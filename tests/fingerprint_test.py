@@ -0,0 +1,65 @@
+import hashlib
+import os
+import tempfile
+
+import codenode
+from codenode import line, lines, indented, freeze, SubtreeCache
+from codenode_utilities import CacheablePartitionedNode
+
+
+class Section(CacheablePartitionedNode):
+    renders = 0
+
+    def header(self):
+        Section.renders += 1
+        yield line(f'section {self.key}')
+
+
+def build():
+    sections = []
+    for i in range(3):
+        section = Section(i)
+        section.add_children(lines('é', 'b'))
+        sections.append(section)
+    return [freeze(line('header')), indented(sections)]
+
+
+def fingerprint_test():
+    text = codenode.dumps(build())
+    assert codenode.fingerprint(build()) == \
+        hashlib.sha256(text.encode()).hexdigest()
+    assert codenode.fingerprint(build(), algorithm='md5') == \
+        hashlib.md5(text.encode()).hexdigest()
+    assert codenode.fingerprint(build(), encoding='utf-16') == \
+        hashlib.sha256(text.encode('utf-16')).hexdigest()
+
+    # the output depends on the writer's settings, so the hash does too.
+    fingerprints = {
+        codenode.fingerprint(build()),
+        codenode.fingerprint(build(), indentation='\t'),
+        codenode.fingerprint(build(), newline='\r\n'),
+        codenode.fingerprint(build(), depth=1),
+    }
+    assert len(fingerprints) == 4
+
+    # matches the hash of a file containing the output.
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'output.txt')
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            codenode.dump(build(), file)
+        with open(path, 'rb') as file:
+            assert hashlib.sha256(file.read()).hexdigest() == \
+                codenode.fingerprint(build())
+
+    # unchanged cacheable nodes aren't processed again.
+    cache = SubtreeCache()
+    Section.renders = 0
+    first = codenode.fingerprint(build(), cache=cache)
+    second = codenode.fingerprint(build(), cache=cache)
+    assert first == second == codenode.fingerprint(build())
+    assert cache.hits == 3
+    assert Section.renders == 6
+
+
+if __name__ == '__main__':
+    fingerprint_test()
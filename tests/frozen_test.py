@@ -0,0 +1,64 @@
+import concurrent.futures
+
+import codenode
+from codenode import line, lines, indent, dedent, indented, freeze
+from codenode.nodes.depth_change import AbsoluteDepthChange
+from codenode.nodes.indentation import RelativeIndentation
+
+
+def header():
+    yield lines('import a', 'import b')
+    yield line('class A:')
+    yield indented(
+        line('def f(self):'),
+        indented(line('pass')),
+        (RelativeIndentation(1), 'x', ' = ', '1', codenode.newline),
+    )
+
+
+def frozen_test():
+    frozen = freeze(header())
+    assert all(
+        not isinstance(operation, str) or operation
+        for operation in frozen.operations
+    )
+
+    for options in (
+        {},
+        {'indentation': '\t', 'newline': '\r\n', 'depth': 3},
+    ):
+        expected = codenode.dumps(header(), **options)
+        assert codenode.dumps(frozen, **options) == expected
+        assert codenode.dumps(frozen, **options) == expected
+        assert codenode.FastWriter(frozen, **options).dumps() == expected
+
+    def document(body):
+        return [line('start'), indent, body, line('end'), dedent, line('!')]
+
+    expected = codenode.dumps(document(header()))
+    assert codenode.dumps(document(frozen)) == expected
+    assert codenode.dumps(freeze(document(frozen))) == expected
+    assert codenode.FastWriter(document(frozen)).dumps() == expected
+
+    absolute = freeze((AbsoluteDepthChange(2), line('a')))
+    assert codenode.dumps([absolute, line('b')]) == '        a\n        b\n'
+
+    for depth in range(2 * frozen.cache_size):
+        codenode.dumps(frozen, depth=depth)
+    assert len(frozen.cache) == frozen.cache_size
+
+    # frozen nodes can be shared between threads evicting cache entries.
+    def dump_depths(offset):
+        return [
+            codenode.dumps(frozen, depth=depth % 32 + offset)
+            for depth in range(2000)
+        ]
+
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(dump_depths, range(8)))
+    assert results[3][5] == codenode.dumps(header(), depth=8)
+    assert len(frozen.cache) <= frozen.cache_size + 8
+
+
+if __name__ == '__main__':
+    frozen_test()
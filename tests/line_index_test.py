@@ -0,0 +1,82 @@
+import codenode
+from codenode import line, lines, indented, freeze, LineIndex
+from codenode.nodes.line_prefix import PushLinePrefix, PopLinePrefix
+
+
+def build():
+    return [
+        line('class A:'),
+        indented(
+            (
+                (
+                    line(f'def method_{i}(self):'),
+                    indented(lines('"""', 'multi\nline', '"""', 'pass')),
+                    codenode.empty_lines(i % 2),
+                )
+                for i in range(20)
+            ),
+            PushLinePrefix('# '),
+            lines('commented', 'out'),
+            PopLinePrefix.of(),
+        ),
+        'no newline at end',
+    ]
+
+
+def expected_range(text, start, end):
+    return ''.join(
+        text.splitlines(keepends=True)[max(start, 0):max(end, 0)]
+    )
+
+
+def line_index_test():
+    for settings in (
+            {},
+            {'indentation': '\t', 'newline': '\r\n', 'depth': 2},
+    ):
+        text = codenode.dumps(build(), **settings)
+        line_count = text.count('\n')
+        frozen = freeze(build())
+        index = LineIndex(frozen, **settings)
+        assert len(index) == line_count
+        assert index.dumps_range(0, line_count + 1) == text
+
+        ranges = [
+            (start, end)
+            for start in range(-1, line_count + 3)
+            for end in range(start, min(start + 5, line_count + 3))
+        ]
+        for start, end in ranges:
+            expected = expected_range(text, start, end)
+            assert index.dumps_range(start, end) == expected
+            assert codenode.dumps_range(
+                build(), start, end, **settings,
+            ) == expected
+            assert codenode.dumps_range(
+                frozen, start, end, **settings,
+            ) == expected
+
+    # frozen nodes share their index between calls.
+    frozen = freeze(build())
+    codenode.dumps_range(frozen, 0, 1)
+    assert LineIndex.of(frozen) is LineIndex.of(frozen)
+    assert LineIndex.of(frozen) is not LineIndex.of(frozen, depth=1)
+
+    # processing stops once the end of the range is reached.
+    processed = 0
+
+    def counted_lines():
+        nonlocal processed
+        for i in range(1000):
+            processed += 1
+            yield line(str(i))
+
+    assert codenode.dumps_range(counted_lines(), 10, 12) == '10\n11\n'
+    assert processed <= 13
+
+    assert codenode.dumps_range([], 0, 10) == ''
+    assert LineIndex([]).dumps_range(0, 10) == ''
+
+
+if __name__ == '__main__':
+    line_index_test()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+
+import codenode
+from codenode import line, lines, indented, freeze
+
+
+def build():
+    return [
+        line('table = ['),
+        indented(lines(*(f"'é{i}'," for i in range(1000)))),
+        line(']'),
+        freeze(indented(line('frozen'))),
+    ]
+
+
+def measure_test():
+    text = codenode.dumps(build())
+    assert codenode.measure(build()) == len(text)
+    assert codenode.measure(build(), encoding='utf-8') == len(text.encode())
+    assert codenode.measure(build(), encoding='utf-16') == \
+        len(text.encode('utf-16'))
+    assert codenode.measure(build(), newline='\r\n', depth=1) == len(
+        codenode.dumps(build(), newline='\r\n', depth=1)
+    )
+    assert codenode.measure([]) == 0
+
+    # preallocated bytearrays are filled in place.
+    size = codenode.measure(build(), encoding='utf-8')
+    assert codenode.dumpb(build(), size=size) == text.encode()
+    buffer = bytearray(b'previous contents')
+    result = codenode.dumpb(build(), size=size, buffer=buffer)
+    assert result is buffer and buffer == text.encode()
+    assert codenode.dumpb(build(), size=size + 10) == text.encode()
+    try:
+        codenode.dumpb(build(), size=size - 1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError
+
+    # writers can fill part of any writable buffer.
+    buffer = bytearray(size + 4)
+    end = codenode.Writer(build()).dump_into(buffer, offset=4)
+    assert end == size + 4 and buffer[4:] == text.encode()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'output.py')
+
+        # measured first when the size isn't given.
+        node = build()
+        assert codenode.dump_mmap(node, path) == size
+        with open(path, 'rb') as file:
+            assert file.read() == text.encode()
+
+        # files are truncated if the output is smaller.
+        assert codenode.dump_mmap(build(), path, size=size + 100) == size
+        assert os.path.getsize(path) == size
+
+        assert codenode.dump_mmap(
+            build(), path, encoding='utf-16', newline='\r\n',
+        ) == len(codenode.dumps(build(), newline='\r\n').encode('utf-16'))
+
+        assert codenode.dump_mmap([], path) == 0
+        assert os.path.getsize(path) == 0
+
+        # output larger than the given size is an error, and the existing
+        # file is left as it is.
+        codenode.dump_mmap(build(), path)
+        try:
+            codenode.dump_mmap(build(), path, size=10)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError
+        with open(path, 'rb') as file:
+            assert file.read() == text.encode()
+
+        # so is output smaller than its measured size, i.e. when part of
+        # the node tree can only be iterated over once.
+        try:
+            codenode.dump_mmap(
+                [build(), (line(str(i)) for i in range(3))], path,
+            )
+        except ValueError:
+            pass
+        else:
+            raise AssertionError
+        with open(path, 'rb') as file:
+            assert file.read() == text.encode()
+        assert os.listdir(directory) == ['output.py']
+
+        # permissions of the existing file are kept.
+        os.chmod(path, 0o640)
+        codenode.dump_mmap(build(), path)
+        assert os.stat(path).st_mode & 0o777 == 0o640
+
+        # failing to replace the file leaves it as it is, and removes the
+        # temporary file.
+        parent, name = os.path.split(directory)
+        try:
+            codenode.dump_mmap(build(), directory)
+        except OSError as error:
+            assert error.__context__ is None
+        else:
+            raise AssertionError
+        assert os.path.isdir(directory)
+        assert not any(
+            entry.startswith(f'.{name}.') for entry in os.listdir(parent)
+        )
+
+
+if __name__ == '__main__':
+    measure_test()
@@ -0,0 +1,63 @@
+import pickle
+
+import codenode
+from codenode.nodes.depth_change import (
+    RelativeDepthChange, AbsoluteDepthChange,
+)
+from codenode.nodes.indentation import (
+    RelativeIndentation, AbsoluteIndentation, CurrentIndentation,
+)
+from codenode.nodes.newline import Newline
+from codenode.nodes.line_prefix import PushLinePrefix, PopLinePrefix
+
+
+def shared_instances_test():
+    assert RelativeDepthChange.of(1) is codenode.indent
+    assert RelativeDepthChange.of(-1) is codenode.dedent
+    assert CurrentIndentation.of() is codenode.indentation
+    assert Newline.of() is codenode.newline
+
+    for node_type in (
+            RelativeDepthChange, AbsoluteDepthChange,
+            RelativeIndentation, AbsoluteIndentation,
+    ):
+        assert node_type.of(2) is node_type.of(2)
+        assert node_type.of(2) is not node_type.of(3)
+        assert type(node_type.of(2)) is node_type
+
+    class CustomNewline(Newline):
+        pass
+
+    assert type(CustomNewline.of()) is CustomNewline
+    assert PopLinePrefix.of() is PopLinePrefix.of()
+
+
+def immutable_nodes_test():
+    nodes = (
+        RelativeDepthChange(1), AbsoluteDepthChange(1),
+        RelativeIndentation(1), AbsoluteIndentation(1),
+        CurrentIndentation(), Newline(),
+        PushLinePrefix('# '), PopLinePrefix(),
+    )
+    for node in nodes:
+        assert not hasattr(node, '__dict__')
+        for name in ('offset', 'value', 'prefix', 'other'):
+            try:
+                setattr(node, name, 2)
+            except AttributeError:
+                pass
+            else:
+                raise AssertionError(f'{node} was modified')
+
+        copy = pickle.loads(pickle.dumps(node))
+        assert type(copy) is type(node)
+        assert repr(copy) == repr(node)
+
+
+def nodes_test():
+    shared_instances_test()
+    immutable_nodes_test()
+
+
+if __name__ == '__main__':
+    nodes_test()
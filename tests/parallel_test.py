@@ -0,0 +1,67 @@
+import functools
+import pathlib
+import tempfile
+
+import codenode
+from codenode import line, lines, indented
+
+
+def module(name, count):
+    return (
+        line(f'# {name}'),
+        line('def f():'),
+        indented(lines(*(f'print({i})' for i in range(count)))),
+    )
+
+
+def broken_module():
+    yield line('ok')
+    yield line(object())
+
+
+def parallel_test():
+    with tempfile.TemporaryDirectory() as directory:
+        directory = pathlib.Path(directory)
+        nodes = {
+            directory / f'module_{i}.py': functools.partial(
+                module, f'module_{i}', i,
+            )
+            for i in range(4)
+        }
+
+        for executor in ('process', 'thread', 'auto'):
+            timings = codenode.dump_many(nodes, workers=2, executor=executor)
+            assert list(timings) == list(nodes)
+            for path, factory in nodes.items():
+                assert path.read_text() == codenode.dumps(factory())
+
+        # generators can't be pickled, so these are dumped using threads.
+        generator_path = directory / 'generator.py'
+        codenode.dump_many({generator_path: iter(module('g', 2))})
+        assert generator_path.read_text() == codenode.dumps(module('g', 2))
+
+        broken_paths = [directory / 'broken_1.py', directory / 'broken_0.py']
+        try:
+            codenode.dump_many(
+                {
+                    broken_paths[0]: broken_module,
+                    directory / 'fine.py': functools.partial(module, 'x', 1),
+                    broken_paths[1]: broken_module,
+                },
+                debug=True,
+            )
+        except codenode.DumpManyError as error:
+            assert list(error.errors) == broken_paths
+            assert all(
+                'Writer stack:' in message
+                for message in error.errors.values()
+            )
+        else:
+            raise AssertionError('expected DumpManyError')
+
+        assert not any(path.exists() for path in broken_paths)
+        assert (directory / 'fine.py').exists()
+
+
+if __name__ == '__main__':
+    parallel_test()
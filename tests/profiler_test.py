@@ -0,0 +1,112 @@
+import pathlib
+import tempfile
+
+import codenode
+from codenode import line, lines, freeze
+from codenode_utilities import PartitionedNode, CacheablePartitionedNode
+from codenode_utilities import suffixer
+
+
+class Function(PartitionedNode):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    def header(self):
+        yield line(f'def {self.name}():')
+
+
+def module():
+    functions = []
+    for i in range(3):
+        function = Function(f'f{i}')
+        function.add_children(lines('a = 1', 'return a'))
+        functions.append(function)
+    return [lines('import os'), functions, freeze(line('# end'))]
+
+
+class CachedFunction(CacheablePartitionedNode):
+    def header(self):
+        yield line(f'def {self.key}():')
+
+
+def totals(profile):
+    """
+    :return: Entry containing the totals of every entry in a profile.
+    """
+    entry = codenode.profiler.ProfileEntry()
+    for stack_entry in profile.stacks.values():
+        entry.add(stack_entry)
+    return entry
+
+
+def profiler_test():
+    for writer_type in (codenode.Writer, codenode.FastWriter):
+        codenode.default_writer_type = writer_type
+        try:
+            profile = codenode.RenderProfile()
+            output = codenode.dumps(module(), profile=profile)
+            assert output == codenode.dumps(module())
+
+            assert totals(profile).characters == len(output)
+            assert totals(profile).chunks == len(list(
+                codenode.Writer(module()).dump_iter()
+            ))
+
+            by_type = profile.by_type()
+            assert by_type['Function'].count == 3
+            # frozen nodes are output whole by the node containing them.
+            assert by_type['list'].characters == len('# end\n')
+
+            subtrees = profile.by_subtree(2)
+            assert set(subtrees) == {
+                ('list', 'tuple'), ('list', 'list'),
+            }
+            assert subtrees[('list', 'list')].characters == len(
+                codenode.dumps(module()[1])
+            )
+
+            assert profile.max_depth == 5
+
+            collapsed = profile.collapsed_stacks().splitlines()
+            assert 'list;list;Function;tuple' in {
+                stack.rpartition(' ')[0] for stack in collapsed
+            }
+            assert all(
+                stack.rpartition(' ')[2].isdigit() for stack in collapsed
+            )
+
+            with tempfile.TemporaryDirectory() as directory:
+                path = pathlib.Path(directory) / 'profile.folded'
+                profile.write_collapsed_stacks(path)
+                assert path.read_text() == profile.collapsed_stacks()
+
+            # output rendered by sub writers or taken from the subtree
+            # cache is only recorded once.
+            def nodes():
+                cached = CachedFunction('cached')
+                cached.add_child(line('pass'))
+                return [
+                    suffixer(' \\')(lines('a = 1', 'b = 2')),
+                    cached,
+                ]
+
+            for cache in (None, codenode.SubtreeCache()):
+                profile = codenode.RenderProfile()
+                output = codenode.dumps(nodes(), profile=profile, cache=cache)
+                assert output == codenode.dumps(nodes())
+                assert totals(profile).characters == len(output)
+                assert all(
+                    path[:1] == ('list',) for path in profile.stacks if path
+                )
+
+        finally:
+            codenode.default_writer_type = codenode.Writer
+
+    profile = codenode.RenderProfile()
+    output = codenode.dumps(module(), profile=profile, debug=True)
+    assert output == codenode.dumps(module())
+
+
+if __name__ == '__main__':
+    profiler_test()
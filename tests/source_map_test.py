@@ -0,0 +1,164 @@
+import os
+import tempfile
+
+import codenode
+from codenode import line, lines, freeze, SourceMap, SubtreeCache
+from codenode_utilities import (
+    PartitionedNode, CacheablePartitionedNode, prefixer,
+)
+
+
+class Function(PartitionedNode):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    def header(self):
+        yield line(f'def {self.name}():')
+
+
+class CachedFunction(CacheablePartitionedNode):
+    def header(self):
+        yield line(f'def {self.key}():')
+
+
+def module():
+    functions = []
+    for i in range(3):
+        function = Function(f'f{i}')
+        function.add_children(lines('a = 1', 'return a'))
+        functions.append(function)
+    cached = CachedFunction('cached')
+    cached.add_child(line('pass'))
+    return [
+        lines('import os'),
+        functions,
+        cached,
+        prefixer('# ')(line('comment')),
+        freeze(line('# end')),
+    ]
+
+
+def owner(source_map, output, text):
+    """
+    :return: Stack path of the node that produced some text.
+    """
+    return source_map.stack_path(source_map.lookup(output.index(text)))
+
+
+def source_map_test():
+    for writer_type in (codenode.Writer, codenode.FastWriter):
+        codenode.default_writer_type = writer_type
+        try:
+            for cache in (None, SubtreeCache()):
+                source_map = SourceMap(keep_nodes=True)
+                output = codenode.dumps(
+                    module(), source_map=source_map, cache=cache,
+                )
+                assert output == codenode.dumps(module())
+                assert source_map.length == len(output)
+
+                assert owner(source_map, output, 'import') == \
+                    ['list', 'tuple', 'tuple']
+                assert owner(source_map, output, 'def f1') == \
+                    ['list', 'list', 'Function', 'tuple']
+                assert owner(source_map, output, 'return') == \
+                    ['list', 'list', 'Function', 'tuple']
+                assert owner(source_map, output, '# end') == \
+                    ['list', 'FrozenNode']
+                assert owner(source_map, output, '# comment') == \
+                    ['list', 'generator', 'tuple']
+                if cache is None:
+                    assert owner(source_map, output, 'def cached') == \
+                        ['list', 'CachedFunction', 'tuple']
+                else:
+                    # cached output is recorded as a whole.
+                    assert owner(source_map, output, 'def cached') == \
+                        ['list', 'CachedFunction']
+
+                # nodes can be looked up from their id.
+                node_id = source_map.lookup(output.index('def f2'))
+                function = source_map.node(source_map.path(node_id)[2])
+                assert isinstance(function, Function)
+                assert function.name == 'f2'
+
+                # lines and columns.
+                output_lines = output.splitlines(keepends=True)
+                for line_index, text in enumerate(output_lines):
+                    for column in range(len(text)):
+                        offset = source_map.offset_for(line_index, column)
+                        assert output[offset] == text[column]
+                        assert source_map.position_for(offset) == \
+                            (line_index, column)
+                        assert source_map.lookup_position(
+                            line_index, column,
+                        ) == source_map.lookup(offset)
+                assert source_map.lookup(len(output)) is None
+                assert source_map.lookup(-1) is None
+                assert source_map.lookup_position(1000, 0) is None
+
+                # runs are only stored when the producing node changes.
+                assert len(source_map) < len(list(
+                    codenode.Writer(module()).dump_iter()
+                ))
+
+            # profiling at the same time doesn't affect the source map or
+            # the profile.
+            source_map = SourceMap()
+            profile = codenode.RenderProfile()
+            output = codenode.dumps(
+                module(), source_map=source_map, profile=profile,
+            )
+            assert output == codenode.dumps(module())
+            assert source_map.length == len(output)
+            assert owner(source_map, output, 'def f1') == \
+                ['list', 'list', 'Function', 'tuple']
+            assert ('list', 'list', 'Function', 'tuple') in profile.stacks
+            assert profile.by_subtree()[('list',)].characters == len(output)
+        finally:
+            codenode.default_writer_type = codenode.Writer
+
+    # str subclasses are recorded like any other string.
+    class Name(str):
+        pass
+
+    source_map = SourceMap()
+    output = codenode.dumps(
+        [line(Name('abc')), line('x')], source_map=source_map,
+    )
+    assert source_map.length == len(output) == 6
+    # each line is its own tuple node.
+    assert source_map.lookup(0) == source_map.lookup(3)
+    assert source_map.lookup(4) == source_map.lookup(5)
+    assert source_map.lookup(0) != source_map.lookup(4)
+
+    # sidecar files contain everything but node references.
+    source_map = SourceMap()
+    output = codenode.dumps(module(), source_map=source_map)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'output.py.map.json')
+        source_map.write(path)
+        loaded = SourceMap.read(path)
+    assert loaded.to_dict() == source_map.to_dict()
+    for offset in range(len(output)):
+        node_id = loaded.lookup(offset)
+        assert node_id == source_map.lookup(offset)
+        assert loaded.stack_path(node_id) == source_map.stack_path(node_id)
+    assert loaded.node(0) == 'list'
+
+    try:
+        SourceMap.from_dict({'version': 2})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError
+
+    # stream output is recorded too.
+    source_map = SourceMap()
+    with tempfile.TemporaryFile('w+') as file:
+        codenode.dump(module(), file, source_map=source_map)
+    assert source_map.length == len(codenode.dumps(module()))
+
+
+if __name__ == '__main__':
+    source_map_test()
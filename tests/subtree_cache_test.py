@@ -0,0 +1,100 @@
+import codenode
+from codenode import line, indented, SubtreeCache
+from codenode_utilities import line_prefixer, CacheablePartitionedNode
+
+
+class Function(CacheablePartitionedNode):
+    renders = 0
+
+    def __init__(self, name, key):
+        super().__init__(key)
+        self.name = name
+
+    def header(self):
+        Function.renders += 1
+        yield line(f'def {self.name}():')
+
+    def body(self):
+        yield from self.children
+        yield line(f'return {self.key!r}')
+
+
+def build(keys):
+    return [line('class A:'), indented(
+        Function(f'f{i}', key) for i, key in enumerate(keys)
+    )]
+
+
+def caching_test():
+    expected = codenode.dumps(build([1, 2, 3]))
+    changed = codenode.dumps(build([1, 5, 3]))
+    tabs = codenode.dumps(build([1, 2, 3]), indentation='\t', depth=1)
+
+    for writer_type in (codenode.Writer, codenode.FastWriter):
+        cache = SubtreeCache()
+        Function.renders = 0
+
+        def dumps(keys, **options):
+            writer = writer_type(build(keys), **options)
+            writer.subtree_cache = cache
+            return writer.dumps()
+
+        assert dumps([1, 2, 3]) == expected
+        assert Function.renders == 3
+        assert (cache.hits, cache.misses) == (0, 3)
+
+        # unchanged subtrees are reused.
+        assert dumps([1, 2, 3]) == expected
+        assert Function.renders == 3
+        assert (cache.hits, cache.misses) == (3, 3)
+
+        assert dumps([1, 5, 3]) == changed
+        assert Function.renders == 4
+
+        # output is cached separately for different writer settings.
+        assert dumps([1, 2, 3], indentation='\t', depth=1) == tabs
+        assert Function.renders == 7
+
+    # nodes without a key are never cached.
+    cache = SubtreeCache()
+    node = build([None, None])
+    assert codenode.dumps(node, cache=cache) == \
+        codenode.dumps(build([None, None]))
+    assert len(cache) == 0
+
+
+def nested_caching_test():
+    cache = SubtreeCache()
+    outer = Function('outer', 'outer')
+    outer.add_children([Function('inner', 'inner')])
+
+    # line prefixes are part of the key.
+    for build_node in (lambda: outer, lambda: line_prefixer('# ')(outer)):
+        expected = codenode.dumps(build_node())
+        assert codenode.dumps(build_node(), cache=cache) == expected
+        assert codenode.dumps(build_node(), cache=cache) == expected
+    assert cache.hits == 2
+    assert len(cache) == 4
+
+
+def eviction_test():
+    cache = SubtreeCache(max_size=2)
+    for keys in ([1, 2, 3], [3]):
+        codenode.dumps(build(keys), cache=cache)
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.hits == 1
+
+    cache.clear()
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses, cache.evictions) == (0, 0, 0)
+
+
+def subtree_cache_test():
+    caching_test()
+    nested_caching_test()
+    eviction_test()
+
+
+if __name__ == '__main__':
+    subtree_cache_test()
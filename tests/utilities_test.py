@@ -0,0 +1,353 @@
+import inspect
+
+import codenode
+from codenode import line, lines, indent, dedent, indented, freeze, newline
+from codenode_utilities import prefixer, suffixer, node_transformer, joined
+from codenode_utilities import line_prefixer
+from codenode_utilities import PartitionedNode
+from codenode_utilities.node_transformer import NodeTransformer, pipeline
+from codenode_utilities.prefixer import prefixer_iter, yield_lines
+from codenode_utilities.suffixer import max_line_length
+
+
+def block():
+    return [
+        line('def f():'),
+        indented(lines('a = 1', 'return a')),
+    ]
+
+
+def prefixer_test():
+    # every line of the rendered output is prefixed, including empty
+    # lines and text after newlines inside strings.
+    node = [line('a'), newline, line('b\nc')]
+    assert codenode.dumps(prefixer('# ')(node)) == '# a\n# \n# b\n# c\n'
+    assert codenode.dumps(prefixer('# ')(block())) == \
+        codenode.dumps(prefixer('# ')(block(), dumps=codenode.dumps))
+
+    comment = line_prefixer('# ')
+
+    node = [line('x = 0'), indented(comment(block()), line('y = 0'))]
+    assert codenode.dumps(node) == (
+        'x = 0\n'
+        '    # def f():\n'
+        '    #     a = 1\n'
+        '    #     return a\n'
+        '    y = 0\n'
+    )
+
+    # the outer writer's settings are used for indentation inside the
+    # prefixed node.
+    assert codenode.dumps(comment(block()), indentation='\t') == (
+        '# def f():\n'
+        '# \ta = 1\n'
+        '# \treturn a\n'
+    )
+
+    quote = line_prefixer('> ')
+
+    def nested():
+        return quote([line('a'), indented(comment(block()))])
+
+    expected = (
+        '> a\n'
+        '>     # def f():\n'
+        '>     #     a = 1\n'
+        '>     #     return a\n'
+    )
+    for writer_type in (codenode.Writer, codenode.FastWriter):
+        assert writer_type(nested()).dumps() == expected
+    assert codenode.dumps(freeze(nested())) == expected
+
+    assert codenode.dumps(
+        [indent, comment(block()), dedent],
+    ) == codenode.dumps(
+        [indent, prefixer('# ')(block()), dedent],
+    )
+    # lines that don't start with indentation aren't prefixed.
+    assert codenode.dumps(comment([line('a'), newline, line('b\nc')])) == \
+        '# a\n\n# b\nc\n'
+
+    assert list(yield_lines(['a\nb\nc', 'd\n', '\ne'])) == [
+        'a', 'b', 'cd', '', 'e',
+    ]
+    assert codenode.dumps(prefixer_iter('# ')(block())) == codenode.dumps(
+        comment(block())
+    )
+
+    # nested renders use the outer writer's settings.
+    assert codenode.dumps(
+        indented(prefixer_iter('# ')(block())),
+        indentation='\t', newline='\r\n',
+    ) == '\t# def f():\r\n\t# \ta = 1\r\n\t# \treturn a\r\n'
+    assert codenode.dumps(
+        suffixer(';')(lines('a', 'bc')), indentation='\t', newline='\r\n',
+    ) == 'a ;\r\nbc;\r\n'
+
+
+def suffixer_test():
+    macro = (
+        line('#define SWAP(a, b)'),
+        indented(lines('int t = a;', 'a = b;', 'b = t;')),
+    )
+    expected = (
+        '#define SWAP(a, b) \\\n'
+        '    int t = a;     \\\n'
+        '    a = b;         \\\n'
+        '    b = t;         \\\n'
+    )
+    assert codenode.dumps(suffixer(' \\')(macro)) == expected
+    assert codenode.dumps(suffixer(' \\', measure=True)(macro)) == expected
+    assert codenode.dumps(suffixer(' \\', window=4)(macro)) == expected
+
+    assert codenode.dumps(suffixer(' \\', column=16)(macro)) == (
+        '#define SWAP(a, b) \\\n'
+        '    int t = a;   \\\n'
+        '    a = b;       \\\n'
+        '    b = t;       \\\n'
+    )
+    assert codenode.dumps(suffixer(' \\', window=2)(macro)) == (
+        '#define SWAP(a, b) \\\n'
+        '    int t = a;     \\\n'
+        '    a = b; \\\n'
+        '    b = t; \\\n'
+    )
+
+    assert max_line_length(['ab\nc', 'def\n', '\nabcd', 'e']) == 5
+
+    # suffixed and prefixed nodes can be frozen or iterated over outside
+    # of a writer, using the default writer settings.
+    for node in (
+            suffixer(' \\')(macro),
+            suffixer(' \\', measure=True)(macro),
+            suffixer(' \\', dumps=codenode.dumps)(macro),
+    ):
+        assert codenode.dumps(freeze(node)) == expected
+    assert codenode.dumps(list(suffixer(' \\')(macro))) == expected
+    assert codenode.dumps(freeze(prefixer_iter('# ')(macro))) == \
+        codenode.dumps(prefixer_iter('# ')(macro))
+    assert codenode.dumps(list(prefixer_iter('# ')(macro))) == \
+        codenode.dumps(prefixer_iter('# ')(macro))
+
+    # a plain generator is returned when the function used is given.
+    assert inspect.isgenerator(suffixer(' \\', dumps=codenode.dumps)(macro))
+    dump_iter = suffixer(
+        ' \\', column=16,
+        dump_iter=lambda node: codenode.Writer(node).dump_iter(),
+    )(macro)
+    assert inspect.isgenerator(dump_iter)
+    assert codenode.dumps(dump_iter) == codenode.dumps(
+        suffixer(' \\', column=16)(macro)
+    )
+
+    try:
+        suffixer(';', column=10, window=2)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('expected ValueError')
+
+
+def node_transformer_test():
+    @node_transformer
+    def upper(node):
+        return node.upper() if isinstance(node, str) else node
+
+    node = [line('a'), indented(line('b'), (line(c) for c in 'cd'))]
+    assert codenode.dumps(upper(node)) == 'A\n    B\n    C\n    D\n'
+
+    # deep node trees don't hit the recursion limit.
+    deep = line('x')
+    for _ in range(10000):
+        deep = [deep]
+    assert codenode.dumps(upper(deep)) == 'X\n'
+
+    @node_transformer(multiple=True)
+    def without_comments(node):
+        if not (isinstance(node, str) and node.startswith('#')):
+            yield node
+
+    materialized = without_comments.materialize(
+        [line('a'), line('# comment'), line('b')]
+    )
+    assert codenode.dumps(materialized) == 'a\n\nb\n'
+    assert codenode.dumps(materialized) == 'a\n\nb\n'
+
+    class Pair(tuple):
+        pass
+
+    class PairTransformer(NodeTransformer):
+        pass
+
+    PairTransformer.register_leaf_type(Pair)
+    transformer = PairTransformer(
+        lambda node: '='.join(node) if isinstance(node, Pair) else node
+    )
+    assert codenode.dumps(
+        transformer(line(Pair(('a', 'b'))))
+    ) == 'a=b\n'
+    assert NodeTransformer.leaf_types == (str,)
+    assert codenode.dumps(
+        node_transformer(leaf_types=(Pair,))(
+            lambda node: str(len(node)) if isinstance(node, Pair) else node
+        )(line(Pair(('a', 'b'))))
+    ) == '2\n'
+
+
+def pipeline_test():
+    @node_transformer
+    def rename(node):
+        return 'value' if node == 'x' else node
+
+    @node_transformer(multiple=True)
+    def strip_comments(node):
+        if not (isinstance(node, str) and node.startswith('#')):
+            yield node
+
+    @node_transformer
+    def call(node):
+        # returns a subtree, which later transformers walk into.
+        return ('print(', node, ')') if node == 'value' else node
+
+    @node_transformer
+    def upper(node):
+        return node.upper() if isinstance(node, str) else node
+
+    def tree():
+        return [
+            line('x'),
+            indented(line('# comment'), (line(c) for c in 'xy')),
+        ]
+
+    transformers = rename, strip_comments, call, upper
+    chained = tree()
+    for transformer in transformers:
+        chained = transformer(chained)
+    expected = codenode.dumps(chained)
+    assert expected == 'PRINT(VALUE)\n    \n    PRINT(VALUE)\n    Y\n'
+
+    fused = pipeline(rename, pipeline(strip_comments, call), upper)
+    assert len(fused.transformers) == 4
+    for writer_type in (codenode.Writer, codenode.FastWriter):
+        assert writer_type(fused(tree())).dumps() == expected
+
+    materialized = fused.materialize(tree())
+    assert codenode.dumps(materialized) == expected
+    assert codenode.dumps(materialized) == expected
+
+    # plain functions are used as transformer functions.
+    assert codenode.dumps(pipeline(upper.function)(line('a'))) == 'A\n'
+
+
+def joined_test():
+    arguments = [f'argument_{i}' for i in range(5)]
+    expected = 'call(' + ', '.join(arguments) + ')\n'
+
+    def nodes():
+        # plain strings are joined in one go, everything else is streamed.
+        yield joined(arguments, start='call(', separator=', ', end=')')
+        yield joined(iter(arguments), start='call(', separator=', ', end=')')
+        yield joined(
+            [*arguments[:-1], ('argument_', '4')],
+            start='call(', separator=', ', end=')',
+        )
+
+    fast, *streamed = nodes()
+    assert fast.parts() == ('call(', ', '.join(arguments), ')')
+    for node in streamed:
+        assert not isinstance(node.parts(), tuple)
+
+    for writer_type in (codenode.Writer, codenode.FastWriter):
+        for node in nodes():
+            assert writer_type(line(node)).dumps() == expected
+
+    assert codenode.dumps(freeze(line(fast))) == expected
+    assert codenode.dumps(line(fast)) == expected
+    assert codenode.dumps(joined(['a', 'b'])) == 'a\nb\n'
+    # the default newline separator interleaves sequences in one list.
+    assert joined(['a', 'b']).parts() == ['', 'a', newline, 'b', newline]
+    assert codenode.dumps(joined(['a', 'b'])) == \
+        codenode.dumps(joined(iter(['a', 'b'])))
+    assert codenode.dumps(joined(lines('a', 'b'), separator='')) == 'a\nb\n\n'
+
+    # empty sequences only output the start.
+    for empty in ([], iter([])):
+        assert codenode.dumps(joined(empty, start='(', end=')')) == '('
+
+    # iterating yields each node, so transformers see every item.
+    def rename(node):
+        return 'value' if node == 'x' else node
+
+    assert list(joined(['x', 'y'], separator=', ', end='')) == \
+        ['', 'x', ', ', 'y', '']
+    for nodes in (['x', 'y'], iter(['x', 'y'])):
+        node = joined(nodes, separator=', ', end='')
+        assert codenode.dumps(node_transformer(rename)(node)) == 'value, y'
+
+
+def child_producer_test():
+    class Class(PartitionedNode):
+        def header(self):
+            yield line('class A:')
+
+    produced = 0
+    rendered = []
+
+    def method(i):
+        yield line(f'def method_{i}(self): ...')
+        # record how many children had been produced when this one
+        # was processed.
+        rendered.append(produced)
+
+    def methods(count):
+        nonlocal produced
+        for i in range(count):
+            produced += 1
+            yield method(i)
+
+    def expected(*names):
+        return codenode.dumps((
+            line('class A:'),
+            indented(lines(*(f'def {name}(self): ...' for name in names))),
+        ))
+
+    node = Class()
+    node.add_child(line('def first(self): ...'))
+    node.add_producer(methods(4))
+    node.add_child(line('def last(self): ...'))
+    assert node.dumps() == expected(
+        'first', *(f'method_{i}' for i in range(4)), 'last',
+    )
+    assert rendered == [1, 2, 3, 4]
+
+    produced = 0
+    rendered.clear()
+    node = Class()
+    node.add_producer(methods(5), batch_size=2)
+    assert node.dumps() == expected(*(f'method_{i}' for i in range(5)))
+    assert rendered == [2, 2, 4, 4, 5]
+
+    # callables are called each time the node is processed.
+    node = Class()
+    node.add_producer(lambda: methods(2))
+    assert node.dumps() == node.dumps() == expected('method_0', 'method_1')
+
+    try:
+        node.add_producer([], batch_size=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError
+
+
+def utilities_test():
+    prefixer_test()
+    suffixer_test()
+    node_transformer_test()
+    pipeline_test()
+    joined_test()
+    child_producer_test()
+
+
+if __name__ == '__main__':
+    utilities_test()
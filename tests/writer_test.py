@@ -0,0 +1,126 @@
+import io
+
+import codenode
+from codenode import line, lines, indented
+
+
+def indentation_cache_test():
+    node = [line('a'), indented(line('b'), indented(line('c'), line('d')))]
+
+    writer = codenode.Writer(node, indentation='  ')
+    chunks = list(writer.dump_iter())
+    assert chunks[6] == '    '
+    assert chunks[6] is chunks[9]
+    assert writer.indentation_cache == {0: '', 1: '  ', 2: '    '}
+
+    writer.indentation = '\t'
+    assert writer.indentation_cache == {}
+    assert writer.get_indentation(2) == '\t\t'
+
+    debug_writer = codenode.debug_patch(codenode.Writer)(node)
+    assert debug_writer.dumps() == codenode.dumps(node)
+    assert debug_writer.indentation_cache[2] == '        '
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def coalescing_test():
+    node = lines(*map(str, range(100)))
+    expected = codenode.dumps(node)
+
+    stream = CountingStream()
+    codenode.dump(node, stream)
+    assert stream.getvalue() == expected
+    assert stream.writes == 300
+
+    stream = CountingStream()
+    codenode.dump(node, stream, buffer_size=64, flush=True)
+    assert stream.getvalue() == expected
+    assert stream.writes == stream.flushes < 10
+
+    chunks = list(codenode.Writer(node).coalesced_dump_iter(64))
+    assert ''.join(chunks) == expected
+    assert all(len(chunk) >= 64 for chunk in chunks[:-1])
+    assert list(codenode.Writer(()).coalesced_dump_iter(64)) == []
+
+
+def bytes_test():
+    node = [line('caf\u00e9 = 1'), indented(line('\u2603'))]
+    expected = codenode.dumps(node)
+
+    for encoding in ('utf-8', 'utf-16', 'latin-1'):
+        errors = 'replace' if encoding == 'latin-1' else 'strict'
+        encoded = expected.encode(encoding, errors)
+
+        stream = io.BytesIO()
+        codenode.dump_bytes(
+            node, stream,
+            encoding=encoding, errors=errors, buffer_size=4,
+        )
+        assert stream.getvalue() == encoded
+        assert codenode.dumpb(
+            node, encoding=encoding, errors=errors,
+        ) == encoded
+
+    buffer = bytearray(b'old contents')
+    result = codenode.dumpb(node, buffer=buffer)
+    assert result is buffer
+    assert buffer == expected.encode()
+
+    try:
+        codenode.dumpb(node, encoding='ascii')
+    except UnicodeEncodeError:
+        pass
+    else:
+        raise AssertionError('expected UnicodeEncodeError')
+
+
+def with_writer_test():
+    writers = []
+
+    def render_separately(writer):
+        writers.append(writer)
+        sub_writer = writer.sub_writer(line('b'))
+        writers.append(sub_writer)
+        return repr(sub_writer.dumps())
+
+    debug_writer_type = codenode.debug_patch(codenode.FastWriter)
+    for writer_type in (codenode.Writer, debug_writer_type):
+        writers.clear()
+        node = indented(line(codenode.with_writer(render_separately)))
+        assert writer_type(
+            node, indentation='\t', newline='\r\n',
+        ).dumps() == "\t'b\\r\\n'\r\n"
+
+        writer, sub_writer = writers
+        assert type(sub_writer) is writer_type
+        assert sub_writer.indentation == '\t'
+        assert sub_writer.newline == '\r\n'
+        assert sub_writer.indentation_cache is writer.indentation_cache
+
+    assert codenode.Writer(None).sub_writer(
+        (), indentation='  ',
+    ).indentation == '  '
+
+
+def writer_test():
+    indentation_cache_test()
+    coalescing_test()
+    bytes_test()
+    with_writer_test()
+
+
+if __name__ == '__main__':
+    writer_test()
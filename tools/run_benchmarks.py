@@ -0,0 +1,75 @@
+import argparse
+import json
+import sys
+
+import codenode
+from benchmarks.runner import (
+    run as run_benchmarks, compare, format_comparison,
+)
+from benchmarks.workloads import workloads
+
+writer_types = {
+    'default': codenode.Writer,
+    'fast': codenode.FastWriter,
+}
+
+
+def run(args=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark codenode, or compare two benchmark runs.',
+    )
+    parser.add_argument(
+        '--output', '-o',
+        help='path to write JSON results to, instead of stdout',
+    )
+    parser.add_argument(
+        '--writer', choices=writer_types, default='default',
+        help='writer type to benchmark',
+    )
+    parser.add_argument(
+        '--workload', action='append', choices=workloads, dest='workloads',
+        help='workload to run, can be given multiple times (default: all)',
+    )
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--compare', nargs=2, metavar=('OLD', 'NEW'),
+        help='compare two JSON result files instead of running benchmarks',
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='relative slowdown flagged as a regression (default: 0.1)',
+    )
+    args = parser.parse_args(args)
+
+    if args.compare:
+        old_path, new_path = args.compare
+        with open(old_path) as file:
+            old = json.load(file)
+        with open(new_path) as file:
+            new = json.load(file)
+
+        sys.stdout.write(
+            format_comparison(old, new, threshold=args.threshold)
+        )
+        if compare(old, new, threshold=args.threshold):
+            sys.exit(1)
+        return
+
+    results = run_benchmarks(
+        writer_type=writer_types[args.writer],
+        names=args.workloads,
+        scale=args.scale,
+        repeat=args.repeat,
+    )
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    run()
@@ -1,8 +1,40 @@
 from tests.basic_test import basic_test
+from tests.writer_test import writer_test
+from tests.fast_writer_test import fast_writer_test
+from tests.frozen_test import frozen_test
+from tests.parallel_test import parallel_test
+from tests.async_writer_test import async_writer_test
+from tests.debug_test import debug_test
+from tests.profiler_test import profiler_test
+from tests.utilities_test import utilities_test
+from tests.nodes_test import nodes_test
+from tests.buffer_test import buffer_test
+from tests.subtree_cache_test import subtree_cache_test
+from tests.fingerprint_test import fingerprint_test
+from tests.file_sink_test import file_sink_test
+from tests.measure_test import measure_test
+from tests.line_index_test import line_index_test
+from tests.source_map_test import source_map_test
 
 
 def run():
     basic_test()
+    writer_test()
+    fast_writer_test()
+    frozen_test()
+    parallel_test()
+    async_writer_test()
+    debug_test()
+    profiler_test()
+    utilities_test()
+    nodes_test()
+    buffer_test()
+    subtree_cache_test()
+    fingerprint_test()
+    file_sink_test()
+    measure_test()
+    line_index_test()
+    source_map_test()
 
 
 if __name__ == '__main__':